@@ -1,30 +1,66 @@
 import os
-from flask import Flask, request, jsonify
+import base64
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
 import requests
-from transformers import pipeline
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
 from datetime import datetime, timedelta
-import sqlite3
+import numpy as np
+from embedding_store import BillEmbeddingStore, QueryEmbeddingCache
+from vector_index import make_index, top_k_indices
+from bill_catalog import BillCatalog
+from bill_sync import bill_from_api, load_catalog, start_sync_worker
+from congress_client import api_get, async_api_get, fetch_as_completed, fetch_concurrently
+from response_cache import ResponseCache, cached_response, cache_stats
+from summarization import SummaryService
+import models
+import db
+import progression
+import voting
+import search_index
+import personalization
+import parsing
+import observability
+from observability import HTTP_REQUEST_SECONDS, INFERENCE_BATCH_SIZE, INFERENCE_SECONDS, SEARCH_STAGE_SECONDS
+
+observability.configure_logging()
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
-# Load API key from environment variable for security
-API_KEY = os.getenv("CONGRESS_API_KEY", "Im5PSE4YRX9G2FZhVchtfXnwNuRQ9oKmU1G6YztB")
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
 
-# Initialize models once at startup (not on every request)
-print("Loading models...")
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn", device=-1)
-semantic_model = SentenceTransformer('all-MiniLM-L6-v2')
-print("Models loaded successfully")
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            route=request.url_rule.rule if request.url_rule else "unmatched",
+            method=request.method,
+            status=response.status_code
+        )
+    return response
+
+# Models load lazily on first use. By default they are warmed on a background
+# thread so /health answers immediately; PRELOAD_MODELS=1 loads them before
+# serving (with gunicorn preload this shares weights across workers).
+if os.getenv("PRELOAD_MODELS", "0") == "1":
+    models.load_all_models()
 
 # Initialize database for enhanced features
 def init_database():
     """Initialize SQLite database for bill tracking and user data"""
-    conn = sqlite3.connect('bill_tracker.db')
+    conn = db.get_connection()
     cursor = conn.cursor()
     
     # Bill progression tracking
@@ -91,134 +127,414 @@ def init_database():
         )
     ''')
     
+    # Precomputed bill embeddings (normalized float32 vectors)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS bill_embeddings (
+            bill_number TEXT PRIMARY KEY,
+            content_hash TEXT NOT NULL,
+            dim INTEGER NOT NULL,
+            embedding BLOB NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Local mirror of the Congress.gov bill catalog
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS bills (
+            bill_number TEXT PRIMARY KEY,
+            congress INTEGER,
+            bill_type TEXT,
+            title TEXT,
+            description TEXT,
+            latest_action TEXT,
+            latest_action_date TEXT,
+            update_date TEXT,
+            url TEXT,
+            synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_bills_update_date ON bills(update_date)')
+    
+    # Bills written by a sync run but not yet published: they move into bills
+    # once their embeddings are computed, so searches never rank unembedded bills
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS bills_staged (
+            bill_number TEXT PRIMARY KEY,
+            congress INTEGER,
+            bill_type TEXT,
+            title TEXT,
+            description TEXT,
+            latest_action TEXT,
+            latest_action_date TEXT,
+            update_date TEXT,
+            url TEXT
+        )
+    ''')
+    
+    # Sync bookkeeping (high-water marks, last run times)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sync_state (
+            key TEXT PRIMARY KEY,
+            value TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Abstractive summaries of each bill's CRS summary, tagged with the
+    # Congress.gov text version they were made from
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS bill_summaries (
+            bill_number TEXT PRIMARY KEY,
+            text_version TEXT NOT NULL,
+            summary TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Per-state roll-call totals for each bill's latest House vote (materialized by voting.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS voting_state_aggregates (
+            bill_number TEXT,
+            state TEXT,
+            roll_call_id TEXT,
+            yes_votes INTEGER,
+            no_votes INTEGER,
+            abstain INTEGER,
+            support_percentage INTEGER,
+            PRIMARY KEY (bill_number, state)
+        )
+    ''')
+    
+    # Per-bill progression bookkeeping: last seen updateDate and action count
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tracked_bills (
+            bill_number TEXT PRIMARY KEY,
+            update_date TEXT,
+            action_count INTEGER DEFAULT 0,
+            last_checked TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Persistent tier of the Congress API response cache
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS api_cache (
+            cache_name TEXT,
+            cache_key TEXT,
+            value TEXT,
+            fetched_at REAL,
+            PRIMARY KEY (cache_name, cache_key)
+        )
+    ''')
+    
+    # Embeddings of normalized search queries (normalized float32 vectors)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS query_embeddings (
+            query TEXT PRIMARY KEY,
+            dim INTEGER NOT NULL,
+            embedding BLOB NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Precomputed personalized digests, one row per user and rank
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS feed_digests (
+            user_id TEXT,
+            rank INTEGER,
+            bill_number TEXT,
+            score REAL,
+            generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, rank)
+        )
+    ''')
+    
+    # Ranked search snapshots by id, so a cursor pages the same ranking on
+    # any worker until it expires (created_at is epoch seconds)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS search_snapshots (
+            snapshot_id TEXT PRIMARY KEY,
+            query TEXT,
+            bill_numbers TEXT,
+            relevance_scores TEXT,
+            created_at REAL
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_search_snapshots_created
+        ON search_snapshots(created_at)
+    ''')
+    
     conn.commit()
-    conn.close()
+    migrate_database(conn)
+
+def migrate_database(conn):
+    """Apply schema migrations newer than the database's PRAGMA user_version"""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    
+    if version < 1:
+        # bill_progression had no natural key, so every fetch appended duplicate
+        # actions. Keep the first copy of each, then enforce uniqueness; the
+        # unique index also serves lookups by bill_number (its leading column).
+        with conn:
+            conn.execute('''
+                DELETE FROM bill_progression
+                WHERE id NOT IN (
+                    SELECT MIN(id) FROM bill_progression
+                    GROUP BY bill_number, date, status
+                )
+            ''')
+            conn.execute('''
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_bill_progression_action
+                ON bill_progression(bill_number, date, status)
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_user_activity_user_created
+                ON user_activity(user_id, created_at)
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_voting_records_bill_state
+                ON voting_records(bill_number, state)
+            ''')
+            conn.execute("PRAGMA user_version = 1")
+        logger.info("Migrated database", extra={"schema_version": 1})
+    
+    if version < 2:
+        # Identify each member vote by roll call so imports are idempotent
+        # and a bill's latest roll call can be picked out
+        with conn:
+            conn.execute("ALTER TABLE voting_records ADD COLUMN roll_call_id TEXT")
+            conn.execute("ALTER TABLE voting_records ADD COLUMN legislator_id TEXT")
+            conn.execute('''
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_voting_records_member_vote
+                ON voting_records(roll_call_id, legislator_id)
+            ''')
+            conn.execute("PRAGMA user_version = 2")
+        logger.info("Migrated database", extra={"schema_version": 2})
+    
+    if version < 3:
+        # Full-text index over the bill mirror for BM25 candidates. FTS rows share
+        # the bills rowid and are kept in sync by triggers; summaries are copied
+        # in as the summarization worker stores them.
+        with conn:
+            conn.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS bills_fts USING fts5(
+                    bill_number, title, latest_action, summary,
+                    tokenize = 'porter unicode61'
+                )
+            ''')
+            conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS bills_fts_insert AFTER INSERT ON bills BEGIN
+                    INSERT INTO bills_fts (rowid, bill_number, title, latest_action, summary)
+                    VALUES (new.rowid, new.bill_number, new.title, new.latest_action,
+                            (SELECT summary FROM bill_summaries WHERE bill_number = new.bill_number));
+                END
+            ''')
+            conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS bills_fts_update AFTER UPDATE ON bills BEGIN
+                    UPDATE bills_fts
+                    SET bill_number = new.bill_number, title = new.title, latest_action = new.latest_action
+                    WHERE rowid = new.rowid;
+                END
+            ''')
+            conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS bills_fts_delete AFTER DELETE ON bills BEGIN
+                    DELETE FROM bills_fts WHERE rowid = old.rowid;
+                END
+            ''')
+            conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS bill_summaries_fts AFTER INSERT ON bill_summaries BEGIN
+                    UPDATE bills_fts SET summary = new.summary
+                    WHERE rowid = (SELECT rowid FROM bills WHERE bill_number = new.bill_number);
+                END
+            ''')
+            conn.execute('''
+                INSERT INTO bills_fts (rowid, bill_number, title, latest_action, summary)
+                SELECT b.rowid, b.bill_number, b.title, b.latest_action, s.summary
+                FROM bills b LEFT JOIN bill_summaries s ON s.bill_number = b.bill_number
+            ''')
+            conn.execute("PRAGMA user_version = 3")
+        logger.info("Migrated database", extra={"schema_version": 3})
+    
+    if version < 4:
+        # Record the normalized query of each search so popular queries can
+        # be counted (and their embeddings warmed) at startup
+        with conn:
+            conn.execute("ALTER TABLE user_activity ADD COLUMN query TEXT")
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_user_activity_type_query
+                ON user_activity(activity_type, query)
+            ''')
+            conn.execute("PRAGMA user_version = 4")
+        logger.info("Migrated database", extra={"schema_version": 4})
 
 # Initialize database on startup
 init_database()
 
+# Bill embeddings are cached on disk so searches only encode the query
+# and any bills that are new or changed since the last search. The exact
+# backend scores the store's catalog-aligned matrix directly; an ANN backend
+# (see VECTOR_INDEX_BACKEND) keeps its own index, updated incrementally.
+VECTOR_INDEX_BACKEND = os.getenv("VECTOR_INDEX_BACKEND", "exact")
+bill_index = None if VECTOR_INDEX_BACKEND == "exact" else make_index(VECTOR_INDEX_BACKEND)
+bill_embedding_store = BillEmbeddingStore(models.encode, index=bill_index)
+
+# Popular queries skip the model entirely; misses go through the inference pool
+query_embeddings = QueryEmbeddingCache(
+    models.encode_interactive,
+    max_entries=int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "10000"))
+)
+QUERY_WARM_COUNT = int(os.getenv("QUERY_EMBEDDING_WARM_COUNT", "500"))
+QUERY_WARM_DAYS = int(os.getenv("QUERY_EMBEDDING_WARM_DAYS", "30"))
+interest_embeddings = personalization.InterestEmbeddings(models.encode_interactive)
+
+# Congress API response caching (TTL / stale window in seconds)
+PERSIST_API_CACHE = os.getenv("API_CACHE_PERSIST", "0") == "1"
+
+def bill_details_from_api(bill_number, bill_data):
+    """Sponsor, status and date for a Congress.gov bill detail payload"""
+    # Extract sponsor info
+    sponsors = bill_data.get("sponsors", [])
+    sponsor_name = "N/A"
+    if sponsors and len(sponsors) > 0:
+        sponsor = sponsors[0]
+        first_name = sponsor.get("firstName", "")
+        last_name = sponsor.get("lastName", "")
+        party = sponsor.get("party", "")
+        state = sponsor.get("state", "")
+        
+        # Build full name
+        full_name = f"{first_name} {last_name}".strip()
+        if full_name and party and state:
+            sponsor_name = f"{full_name} ({party}-{state})"
+        elif full_name:
+            sponsor_name = full_name
+    
+    # Extract latest action with date
+    latest_action = bill_data.get("latestAction", {})
+    action_text = latest_action.get("text", "N/A")
+    action_date = latest_action.get("actionDate", "N/A")
+    
+    logger.debug("Fetched bill details", extra={
+        "bill_number": bill_number, "sponsor": sponsor_name, "status": action_text, "date": action_date
+    })
+    
+    return {
+        "sponsor": sponsor_name,
+        "status": action_text,
+        "date": action_date
+    }
+
+def bill_details_unavailable():
+    return {
+        "sponsor": "N/A",
+        "status": "N/A",
+        "date": "N/A"
+    }
+
+@cached_response("bill_details", ttl=3600, stale_ttl=86400, max_entries=4096,
+                 persist=PERSIST_API_CACHE, cache_if=lambda d: d["status"] != "N/A")
 def fetch_bill_details(bill_number):
     """Fetch detailed information for a specific bill"""
-    url = f"https://api.congress.gov/v3/bill/118/hr/{bill_number}"
-    params = {"api_key": API_KEY}
-    
     try:
-        r = requests.get(url, params=params, timeout=10)
+        r = api_get(f"/bill/118/hr/{bill_number}")
         r.raise_for_status()
-        bill_data = r.json().get("bill", {})
-        
-        # Extract sponsor info
-        sponsors = bill_data.get("sponsors", [])
-        sponsor_name = "N/A"
-        if sponsors and len(sponsors) > 0:
-            sponsor = sponsors[0]
-            first_name = sponsor.get("firstName", "")
-            last_name = sponsor.get("lastName", "")
-            party = sponsor.get("party", "")
-            state = sponsor.get("state", "")
-            
-            # Build full name
-            full_name = f"{first_name} {last_name}".strip()
-            if full_name and party and state:
-                sponsor_name = f"{full_name} ({party}-{state})"
-            elif full_name:
-                sponsor_name = full_name
-        
-        # Extract latest action with date
-        latest_action = bill_data.get("latestAction", {})
-        action_text = latest_action.get("text", "N/A")
-        action_date = latest_action.get("actionDate", "N/A")
-        
-        print(f"Bill {bill_number}: sponsor={sponsor_name}, status={action_text}, date={action_date}")
-        
-        return {
-            "sponsor": sponsor_name,
-            "status": action_text,
-            "date": action_date
-        }
-    
+        return bill_details_from_api(bill_number, r.json().get("bill", {}))
     except Exception as e:
-        print(f"Error fetching bill {bill_number} details: {e}")
-        return {
-            "sponsor": "N/A",
-            "status": "N/A",
-            "date": "N/A"
-        }
+        logger.warning("Error fetching bill details", extra={"bill_number": bill_number, "error": str(e)})
+        return bill_details_unavailable()
+
+async def _fetch_bill_details_async(bill_number):
+    try:
+        r = await async_api_get(f"/bill/118/hr/{bill_number}")
+        r.raise_for_status()
+        return bill_details_from_api(bill_number, r.json().get("bill", {}))
+    except Exception as e:
+        logger.warning("Error fetching bill details", extra={"bill_number": bill_number, "error": str(e)})
+        return bill_details_unavailable()
 
+# Async variant for the ASGI handlers; shares cache entries with fetch_bill_details
+fetch_bill_details_async = fetch_bill_details.cache.wrap(
+    _fetch_bill_details_async, cache_if=lambda d: d["status"] != "N/A"
+)
+
+@cached_response("bill_list", ttl=300, stale_ttl=3600, max_entries=16,
+                 persist=PERSIST_API_CACHE, cache_if=bool)
 def fetch_latest_bills(limit=250):
     """Fetch bills from Congress API with error handling"""
-    url = f"https://api.congress.gov/v3/bill/118/hr"
     params = {
-        "api_key": API_KEY,
         "limit": limit,
         "sort": "updateDate+desc"
     }
     
     try:
-        r = requests.get(url, params=params, timeout=10)
+        r = api_get("/bill/118/hr", params)
         r.raise_for_status()
         bills_data = r.json().get("bills", [])
         
-        bills = []
-        for bill in bills_data:
-            title = bill.get("title", "")
-            bill_number = bill.get("number", "")
-            
-            # Create description for semantic search
-            description = title
-            if bill.get("latestAction"):
-                latest_action = bill["latestAction"].get("text", "")
-                description += f" {latest_action}"
-            
-            bills.append({
-                "number": bill_number,
-                "title": title,
-                "description": description,
-                "url": f"https://www.congress.gov/bill/118th-congress/house-bill/{bill_number}"
-            })
-        
-        return bills
+        return [bill_from_api(bill) for bill in bills_data]
     
     except requests.exceptions.RequestException as e:
-        print(f"Error fetching bills: {e}")
+        logger.warning("Error fetching bills", extra={"error": str(e)})
         return []
 
-def find_relevant_bills(query, bills, top_k=12):
-    """Use semantic similarity to find relevant bills"""
-    if not bills:
-        return []
+# Hybrid retrieval: BM25 candidates from the FTS index are fused with vector
+# similarity. When at least LEXICAL_PREFILTER_MIN bills match lexically, only
+# those candidates' vectors are scored instead of searching the vector index.
+LEXICAL_CANDIDATES = int(os.getenv("LEXICAL_CANDIDATES", "200"))
+LEXICAL_PREFILTER_MIN = int(os.getenv("LEXICAL_PREFILTER_MIN", "100"))
+
+def find_relevant_bills(query, catalog, top_k=12):
+    """Rank a BillCatalog by fusing lexical (BM25) and semantic rankings.
+    
+    Returns (rows, relevance_scores): catalog rows best first and their cosine similarities.
+    """
+    if not len(catalog):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
     
     # Encode query
-    query_embedding = semantic_model.encode([query])
+    with SEARCH_STAGE_SECONDS.time(stage="query_encode"):
+        query_embedding = query_embeddings.get(query)
+    
+    # Make sure every bill is embedded and indexed (encodes only new or changed bills)
+    with SEARCH_STAGE_SECONDS.time(stage="bill_encode"):
+        bill_matrix = bill_embedding_store.matrix_for(catalog)
     
-    # Encode bill descriptions
-    bill_texts = [f"{b['title']} {b['description']}" for b in bills]
-    bill_embeddings = semantic_model.encode(bill_texts)
+    # Lexical candidates from the full-text index
+    with SEARCH_STAGE_SECONDS.time(stage="lexical"):
+        lexical_ids = search_index.lexical_search(query, LEXICAL_CANDIDATES)
     
-    # Calculate similarity
-    similarities = cosine_similarity(query_embedding, bill_embeddings)[0]
+    rank_started = time.perf_counter()
+    lexical_rows = catalog.rows_for(lexical_ids)
+    
+    if len(lexical_rows) >= LEXICAL_PREFILTER_MIN:
+        # Score only the lexical candidates' vectors
+        candidate_scores = bill_matrix[lexical_rows] @ query_embedding
+        semantic_rows = lexical_rows[np.argsort(-candidate_scores, kind="stable")]
+    elif bill_index is None:
+        # Exact top candidates by cosine similarity (dot product over normalized vectors)
+        semantic_rows = top_k_indices(bill_matrix @ query_embedding, LEXICAL_CANDIDATES)
+    else:
+        # Approximate top candidates from the ANN index
+        top_ids, _ = bill_index.search(query_embedding, LEXICAL_CANDIDATES)
+        semantic_rows = catalog.rows_for(top_ids)
     
-    # Get top k indices
-    top_indices = np.argsort(similarities)[-top_k:][::-1]
+    # Reciprocal rank fusion of both rankings
+    fused = search_index.reciprocal_rank_fusion(lexical_rows.tolist(), semantic_rows.tolist())[:top_k]
+    rows = np.fromiter((row for row, _ in fused), dtype=np.int64, count=len(fused))
+    similarity = bill_matrix[rows] @ query_embedding
     
-    # Filter by minimum similarity threshold (lowered for more results)
-    relevant_bills = []
-    for idx in top_indices:
-        if similarities[idx] > 0.15:  # Lowered threshold for more inclusive results
-            bill = bills[idx].copy()
-            bill['relevance_score'] = float(similarities[idx])
-            relevant_bills.append(bill)
+    # Keep lexical matches and bills above the similarity threshold (lowered for more results)
+    keep = (similarity > 0.15) | np.isin(rows, lexical_rows)
     
     # If we still don't have enough results, add more with lower threshold
-    if len(relevant_bills) < 6:
-        for idx in top_indices:
-            if similarities[idx] > 0.1 and len(relevant_bills) < 8:
-                bill = bills[idx].copy()
-                bill['relevance_score'] = float(similarities[idx])
-                if bill not in relevant_bills:
-                    relevant_bills.append(bill)
+    kept = int(keep.sum())
+    if kept < 6:
+        extra = np.flatnonzero(~keep & (similarity > 0.1))[:max(0, 8 - kept)]
+        keep[extra] = True
     
-    return relevant_bills
+    SEARCH_STAGE_SECONDS.observe(time.perf_counter() - rank_started, stage="rank")
+    # Fused order is kept, so results stay sorted by fused lexical + semantic rank
+    return rows[keep], similarity[keep]
 
 
 
@@ -273,293 +589,515 @@ def create_age_appropriate_summary(text, title, age_group="adult"):
 def create_fast_summary(text, title):
     return create_age_appropriate_summary(text, title, "adult")
 
-def track_user_activity(user_id, activity_type, bill_number=None, reading_time=None, complexity_score=None):
+# Activity events are buffered and written in batches off the request path
+activity_writer = db.BufferedWriter('''
+    INSERT INTO user_activity 
+    (user_id, activity_type, bill_number, reading_time_seconds, complexity_score, query)
+    VALUES (?, ?, ?, ?, ?, ?)
+''', flush_interval=float(os.getenv("ACTIVITY_FLUSH_SECONDS", "1.0")))
+
+def track_user_activity(user_id, activity_type, bill_number=None, reading_time=None, complexity_score=None, query=None):
     """Track user activity for statistics"""
-    try:
-        conn = sqlite3.connect('bill_tracker.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO user_activity 
-            (user_id, activity_type, bill_number, reading_time_seconds, complexity_score)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (user_id, activity_type, bill_number, reading_time, complexity_score))
-        
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        print(f"Error tracking user activity: {e}")
+    activity_writer.write((user_id, activity_type, bill_number, reading_time, complexity_score, query))
 
-def summarize_text(text, max_length=200, min_length=80):
-    """Summarize text with error handling"""
-    try:
-        # Skip if text is already short
-        if len(text.split()) < min_length:
-            return text
-        
-        # Truncate if too long for model
-        max_input = 1024
+def fetch_summary_source(bill_number):
+    """The bill's latest CRS summary from Congress.gov as (version, plain text); None before one is published.
+    
+    The version is the summary's Congress.gov text version code plus its
+    update date, so status changes to the bill never invalidate a summary.
+    """
+    r = api_get(f"/bill/118/hr/{bill_number}/summaries")
+    r.raise_for_status()
+    summaries = r.json().get("summaries", [])
+    if not summaries:
+        return None
+    latest = max(summaries, key=lambda s: (s.get("actionDate", ""), s.get("updateDate", "")))
+    text = parsing.html_to_text(latest.get("text", ""))
+    if not text:
+        return None
+    return f"{latest.get('versionCode', '')}@{latest.get('updateDate', '')}", text
+
+def summarize_texts(texts, max_length=200, min_length=80):
+    """Summarize a batch of texts in one model call.
+    
+    Texts under min_length words have nothing to condense and come back as
+    None. Model errors are raised, so callers never store a fallback as if
+    it were a summary.
+    """
+    summaries = [None] * len(texts)
+    
+    # Skip texts that are already short; truncate ones too long for the model
+    max_input = 1024
+    to_model = []
+    for i, text in enumerate(texts):
         words = text.split()
-        if len(words) > max_input:
-            text = " ".join(words[:max_input])
-        
-        result = summarizer(
-            text, 
+        if len(words) >= min_length:
+            to_model.append((i, " ".join(words[:max_input])))
+    
+    if not to_model:
+        return summaries
+    
+    summarizer = models.get_summarizer()
+    INFERENCE_BATCH_SIZE.observe(len(to_model), model="summarizer")
+    with INFERENCE_SECONDS.time(model="summarizer"):
+        results = summarizer(
+            [text for _, text in to_model],
             max_length=max_length, 
             min_length=min_length, 
             do_sample=False,
-            truncation=True
+            truncation=True,
+            batch_size=len(to_model)
         )
-        return result[0]["summary_text"]
+    for (i, _), result in zip(to_model, results):
+        summaries[i] = result["summary_text"]
     
-    except Exception as e:
-        print(f"Summarization error: {e}")
-        # Return truncated original if summarization fails
-        return " ".join(text.split()[:80]) + "..."
+    return summaries
 
-@app.route("/search_bills", methods=["POST"])
-def search_bills():
-    """Search for relevant bills based on query with pagination"""
+def summarize_text(text, max_length=200, min_length=80):
+    """Summarize a single text; None if it is too short to need a summary"""
+    return summarize_texts([text], max_length=max_length, min_length=min_length)[0]
+
+# Micro-batches summarization of bills' CRS summaries across concurrent
+# requests and caches results per Congress.gov text version
+summary_service = SummaryService(
+    summarize_texts,
+    fetch_summary_source,
+    max_batch_size=int(os.getenv("SUMMARY_BATCH_SIZE", "8")),
+    max_wait_seconds=float(os.getenv("SUMMARY_MAX_WAIT_MS", "50")) / 1000,
+    recheck_seconds=int(os.getenv("SUMMARY_SOURCE_RECHECK_SECONDS", "21600"))
+)
+
+def on_bills_synced(catalog):
+    """Precompute embeddings and queue summaries for synced bills, off the request path"""
+    bill_embedding_store.matrix_for(catalog)
+    # A new CRS summary moves the bill's updateDate; only those bills are rechecked
+    published = load_catalog()
+    previous = dict(zip(published.numbers, published.update_dates))
+    queued = summary_service.presummarize(
+        number for number, update_date in zip(catalog.numbers, catalog.update_dates)
+        if previous.get(number) != update_date
+    )
+    if queued:
+        logger.info("Queued bills for background summarization", extra={"queued": queued})
+
+def warm_query_embeddings():
+    """Preload embeddings for the most frequent recent searches, encoding any never stored"""
     try:
-        data = request.get_json()
-        if not data:
-            return jsonify({"error": "Invalid JSON"}), 400
-        
-        query = data.get("query", "").strip()
-        page = data.get("page", 1)
-        per_page = data.get("per_page", 5)
-        
-        if not query:
-            return jsonify({"error": "Query parameter is required"}), 400
-        
-        # Fetch bills (reduced for faster initial load)
-        print(f"Fetching bills for query: {query}, page: {page}")
-        bills = fetch_latest_bills(limit=100)  # Reduced from 250
-        
-        if not bills:
-            return jsonify({"error": "Unable to fetch bills from Congress API"}), 503
-        
-        # Find relevant bills using semantic search
-        print(f"Finding relevant bills...")
-        relevant_bills = find_relevant_bills(query, bills, top_k=20)  # Get more for pagination
-        
-        if not relevant_bills:
-            return jsonify({
-                "query": query,
-                "bills": [],
-                "total_found": 0,
-                "page": page,
-                "per_page": per_page,
-                "has_more": False,
-                "message": "No relevant bills found for your query"
-            })
-        
-        # Sort by relevance score first, then by date (newest first)
-        relevant_bills.sort(key=lambda x: (-x["relevance_score"], x.get("date", "0000-00-00")), reverse=False)
-        
-        # Calculate pagination
-        start_idx = (page - 1) * per_page
-        end_idx = start_idx + per_page
-        paginated_bills = relevant_bills[start_idx:end_idx]
-        
-        # Process only the bills for this page
-        results = []
-        for bill in paginated_bills:
-            print(f"Processing bill H.R. {bill['number']}")
-            
-            # Get bill details for this page only
-            details = fetch_bill_details(bill["number"])
-            
-            # Use faster summarization
-            summary = create_fast_summary(bill["description"], bill["title"])
-            
-            results.append({
-                "number": bill["number"],
-                "title": bill["title"],
-                "summary": summary,
-                "sponsor": details["sponsor"],
-                "status": details["status"],
-                "date": details["date"],
-                "relevance_score": bill["relevance_score"],
-                "url": bill["url"]
-            })
-        
-        # Sort results by date (newest first)
-        results.sort(key=lambda x: parse_date_for_sorting(x["date"]), reverse=True)
-        
-        has_more = end_idx < len(relevant_bills)
-        
-        print(f"Returning {len(results)} results for page {page}")
-        return jsonify({
-            "query": query,
-            "bills": results,
-            "total_found": len(relevant_bills),
-            "page": page,
-            "per_page": per_page,
-            "has_more": has_more
-        })
+        rows = db.query('''
+            SELECT query
+            FROM user_activity
+            WHERE activity_type = 'search' AND query IS NOT NULL
+              AND created_at >= datetime('now', ?)
+            GROUP BY query
+            ORDER BY COUNT(*) DESC
+            LIMIT ?
+        ''', (f"-{QUERY_WARM_DAYS} days", QUERY_WARM_COUNT))
+        queries = [row[0] for row in rows]
+        if queries:
+            # Background work: encode directly rather than through the request-path pool
+            encoded = query_embeddings.warm(queries, encode=models.encode)
+            logger.info("Warmed query embeddings", extra={"queries": len(queries), "encoded": encoded})
+    except Exception:
+        logger.exception("Error warming query embeddings")
+
+def start_background_workers():
+    """Start this process's background threads.
+
+    Runs at import, or from gunicorn's post_fork hook when the app is
+    preloaded in the master, since threads do not survive a fork.
+    """
+    if os.getenv("PRELOAD_MODELS", "0") != "1" and os.getenv("WARM_MODELS", "1") == "1":
+        models.warm_models_in_background()
+    activity_writer.start()
+    summary_service.start()
+    query_embeddings.start()
+    if QUERY_WARM_COUNT > 0:
+        threading.Thread(target=warm_query_embeddings, name="query-warmup", daemon=True).start()
     
-    except Exception as e:
-        print(f"Error processing request: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({"error": "Internal server error"}), 500
+    # Mirror the bill catalog in the background so searches never wait on
+    # Congress.gov; with several server processes only one runs the sync
+    if os.getenv("BILL_SYNC_ENABLED", "1") == "1" and db.try_process_lock("bill-sync"):
+        start_sync_worker(
+            interval_seconds=int(os.getenv("BILL_SYNC_INTERVAL", "900")),
+            on_update=on_bills_synced
+        )
+        # Pull new actions for tracked bills whose updateDate moved in the mirror
+        progression.start_progression_refresher(
+            interval_seconds=int(os.getenv("PROGRESSION_REFRESH_INTERVAL", "900"))
+        )
 
-def track_bill_progression(bill_number):
-    """Track and store bill progression over time"""
+if os.getenv("DEFER_BACKGROUND_WORKERS", "0") != "1":
+    start_background_workers()
+
+def overloaded_response(e):
+    """503 with Retry-After when the inference pool sheds load"""
+    logger.warning("Shedding request", extra={"reason": str(e)})
+    response = jsonify({"error": "Server is busy, please retry shortly"})
+    response.status_code = 503
+    response.headers["Retry-After"] = "5"
+    return response
+
+# Ranked results per normalized query, so repeat first pages skip ranking
+search_results = ResponseCache(
+    "search_results", ttl=int(os.getenv("SEARCH_RESULT_TTL", "300")), max_entries=512
+)
+
+# Every snapshot is also stored in search_snapshots for SEARCH_CURSOR_TTL, so
+# a cursor pages the ranking it came from even after the query's cache entry
+# has expired, been evicted, or lives on another worker. Older cursors get 410.
+SEARCH_CURSOR_TTL = int(os.getenv("SEARCH_CURSOR_TTL", "3600"))
+search_snapshots = ResponseCache("search_snapshots", ttl=SEARCH_CURSOR_TTL, max_entries=512)
+
+class CursorExpired(Exception):
+    """The cursor's snapshot is gone; the client must restart from page 1"""
+
+def normalize_query(query):
+    """Case-fold, drop punctuation and collapse whitespace so equivalent queries share results and embeddings"""
+    return " ".join(re.sub(r"[^\w\s]", " ", query.casefold()).split())
+
+def encode_cursor(snapshot_id, offset):
+    """Opaque pagination token pointing at an offset within a ranked snapshot"""
+    payload = json.dumps({"s": snapshot_id, "o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    """Return (snapshot_id, offset) from a cursor; raises ValueError if malformed"""
     try:
-        # Fetch bill actions/history
-        url = f"https://api.congress.gov/v3/bill/118/hr/{bill_number}/actions"
-        params = {"api_key": API_KEY, "limit": 50}
-        
-        response = requests.get(url, params=params, timeout=10)
-        if not response.ok:
-            return []
-        
-        actions_data = response.json().get("actions", [])
-        
-        # Store in database
-        conn = sqlite3.connect('bill_tracker.db')
-        cursor = conn.cursor()
-        
-        progression_stages = []
-        stage_mapping = {
-            "introduced": 1,
-            "committee": 2,
-            "floor": 3,
-            "passed": 4,
-            "senate": 5,
-            "signed": 6,
-            "vetoed": 6
-        }
-        
-        for action in actions_data:
-            action_text = action.get("text", "").lower()
-            action_date = action.get("actionDate", "")
-            
-            # Determine stage
-            stage = 1  # default
-            for keyword, stage_num in stage_mapping.items():
-                if keyword in action_text:
-                    stage = stage_num
-                    break
-            
-            # Insert or update progression
-            cursor.execute('''
-                INSERT OR REPLACE INTO bill_progression 
-                (bill_number, status, date, description, stage)
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        offset = int(payload["o"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if offset < 0:
+        raise ValueError("Invalid cursor")
+    return str(payload["s"]), offset
+
+def search_catalog():
+    """The bill catalog to rank; read from the local mirror, only hitting the API before the first sync lands"""
+    catalog = load_catalog()
+    if not len(catalog):
+        catalog = BillCatalog.from_bills(fetch_latest_bills(limit=100))
+    return catalog
+
+def rank_search_results(query):
+    """Rank the bill catalog for a query into a snapshot that pages are sliced from.
+    
+    A snapshot holds catalog rows and scores only; bills are materialized per page.
+    """
+    with SEARCH_STAGE_SECONDS.time(stage="upstream_fetch"):
+        catalog = search_catalog()
+    
+    if not len(catalog):
+        return None
+    
+    logger.debug("Finding relevant bills", extra={"query": query, "bills": len(catalog)})
+    rows, relevance_scores = find_relevant_bills(query, catalog, top_k=20)  # Get more for pagination
+    
+    snapshot = {
+        "id": uuid.uuid4().hex,
+        "query": query,
+        "catalog": catalog,
+        "rows": rows,
+        "relevance_scores": relevance_scores,
+        "created_at": time.time()
+    }
+    # Cursor pages on this worker read it from memory; the table serves other workers and evictions
+    search_snapshots.put(snapshot["id"], snapshot)
+    save_search_snapshot(snapshot)
+    return snapshot
+
+def save_search_snapshot(snapshot):
+    """Store a snapshot's ranking by bill number for cursor lookups, dropping expired ones"""
+    try:
+        with db.transaction() as conn:
+            conn.execute(
+                "DELETE FROM search_snapshots WHERE created_at < ?", (snapshot["created_at"] - SEARCH_CURSOR_TTL,)
+            )
+            conn.execute('''
+                INSERT OR REPLACE INTO search_snapshots
+                (snapshot_id, query, bill_numbers, relevance_scores, created_at)
                 VALUES (?, ?, ?, ?, ?)
-            ''', (bill_number, action.get("text", ""), action_date, action_text, stage))
-            
-            progression_stages.append({
-                "date": action_date,
-                "status": action.get("text", ""),
-                "stage": stage,
-                "description": action_text
-            })
-        
-        conn.commit()
-        conn.close()
-        
-        return sorted(progression_stages, key=lambda x: x["date"])
-        
-    except Exception as e:
-        print(f"Error tracking bill progression: {e}")
-        return []
+            ''', (
+                snapshot["id"],
+                snapshot["query"],
+                json.dumps([snapshot["catalog"].numbers[row] for row in snapshot["rows"].tolist()]),
+                json.dumps(snapshot["relevance_scores"].tolist()),
+                snapshot["created_at"]
+            ))
+    except sqlite3.Error as e:
+        logger.warning("Error saving search snapshot", extra={"error": str(e)})
 
-    """Generate personalized bill recommendations"""
-    if not bills:
-        return []
+def load_stored_snapshot(snapshot_id):
+    """Rebuild a stored snapshot against the current catalog; None if expired or no longer replayable"""
+    rows = db.query('''
+        SELECT query, bill_numbers, relevance_scores, created_at
+        FROM search_snapshots
+        WHERE snapshot_id = ? AND created_at >= ?
+    ''', (snapshot_id, time.time() - SEARCH_CURSOR_TTL))
+    if not rows:
+        return None
+    query, bill_numbers, relevance_scores, created_at = rows[0]
+    bill_numbers = json.loads(bill_numbers)
+    
+    catalog = search_catalog()
+    catalog_rows = catalog.rows_for(bill_numbers)
+    if len(catalog_rows) != len(bill_numbers):
+        # A ranked bill is missing from this catalog, so offsets would shift
+        return None
+    return {
+        "id": snapshot_id,
+        "query": query,
+        "catalog": catalog,
+        "rows": catalog_rows,
+        "relevance_scores": np.array(json.loads(relevance_scores), dtype=np.float32),
+        "created_at": created_at
+    }
+
+def parse_search_request(data):
+    """Validate a /search_bills body into search parameters; raises ValueError with the client error"""
+    if not data:
+        raise ValueError("Invalid JSON")
     
-    # Weight bills based on user preferences
-    weighted_bills = []
+    query = data.get("query", "").strip()
+    page = data.get("page", 1)
+    per_page = data.get("per_page", 5)
+    cursor = data.get("cursor")
     
-    for bill in bills:
-        weight = bill.get("relevance_score", 0.5)
-        
-        # Location-based weighting
-        if user_location:
-            bill_text = f"{bill.get('title', '')} {bill.get('description', '')}".lower()
-            if user_location.lower() in bill_text:
-                weight += 0.2
-        
-        # Interest-based weighting
-        if user_interests:
-            interests_list = user_interests.split(',')
-            bill_text = f"{bill.get('title', '')} {bill.get('description', '')}".lower()
-            
-            for interest in interests_list:
-                if interest.strip().lower() in bill_text:
-                    weight += 0.15
-        
-        bill_copy = bill.copy()
-        bill_copy['personalized_score'] = min(1.0, weight)
-        weighted_bills.append(bill_copy)
+    if not query:
+        raise ValueError("Query parameter is required")
+    
+    # bool is an int subclass; reject it along with strings, floats and non-positive values
+    for name, value in (("page", page), ("per_page", per_page)):
+        if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+            raise ValueError(f"{name} must be a positive integer")
+    
+    if cursor:
+        try:
+            snapshot_id, start_idx = decode_cursor(cursor)
+        except ValueError:
+            raise ValueError("Invalid cursor")
+        page = start_idx // per_page + 1
+    else:
+        snapshot_id, start_idx = None, (page - 1) * per_page
     
-    # Sort by personalized score
-    return sorted(weighted_bills, key=lambda x: x['personalized_score'], reverse=True)
+    return {
+        "query": query,
+        "user_id": data.get("user_id") or "anonymous",
+        "page": page,
+        "per_page": per_page,
+        "snapshot_id": snapshot_id,
+        "start_idx": start_idx,
+        "stream": bool(data.get("stream"))
+    }
 
-def generate_voting_heatmap_data(bill_number):
-    """Generate voting pattern data for heatmap visualization"""
-    # This would typically fetch real voting data from Congress API
-    # For now, we'll generate sample data structure
-    
-    states = [
-        "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "FL", "GA",
-        "HI", "ID", "IL", "IN", "IA", "KS", "KY", "LA", "ME", "MD",
-        "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH", "NJ",
-        "NM", "NY", "NC", "ND", "OH", "OK", "OR", "PA", "RI", "SC",
-        "SD", "TN", "TX", "UT", "VT", "VA", "WA", "WV", "WI", "WY"
-    ]
-    
-    # Generate sample voting data (in real implementation, fetch from API)
-    voting_data = {}
-    for state in states:
-        # Sample data - replace with real API calls
-        voting_data[state] = {
-            "yes_votes": np.random.randint(0, 10),
-            "no_votes": np.random.randint(0, 10),
-            "abstain": np.random.randint(0, 3),
-            "support_percentage": np.random.randint(20, 80)
-        }
+def load_search_snapshot(search):
+    """Ranked snapshot for the search.
+    
+    Queries are ranked once per normalized query; cursor pages read the
+    snapshot they were issued from, and raise CursorExpired once it is gone.
+    """
+    logger.info("Search", extra={"query": search["query"], "page": search["page"]})
+    normalized_query = normalize_query(search["query"])
     
-    return voting_data
+    if search["snapshot_id"]:
+        snapshot = search_snapshots.get_or_fetch(
+            search["snapshot_id"],
+            lambda: load_stored_snapshot(search["snapshot_id"]),
+            cache_if=lambda result: result is not None
+        )
+        if (snapshot is None or snapshot["query"] != normalized_query
+                or time.time() - snapshot["created_at"] >= SEARCH_CURSOR_TTL):
+            logger.info("Cursor snapshot expired", extra={"query": normalized_query})
+            raise CursorExpired()
+        return snapshot
+    
+    if search["start_idx"] == 0:
+        # First-page searches feed the popular-query counts used to warm query embeddings
+        track_user_activity(search["user_id"], "search", query=normalized_query)
+    return search_results.get_or_fetch(
+        normalized_query,
+        lambda: rank_search_results(normalized_query),
+        cache_if=lambda result: result is not None
+    )
 
-def parse_date_for_sorting(date_str):
-    """Parse date string for sorting (newest first)"""
-    if not date_str or date_str in ['N/A', 'Recent', 'Loading...']:
-        return "0000-00-00"  # Put unknown dates at the end
+CURSOR_EXPIRED_ERROR = {"error": "These search results have expired; search again", "expired": True}
+
+def search_page_bills(search, snapshot):
+    """The ranked bills on the requested page, as dicts"""
+    page = slice(search["start_idx"], search["start_idx"] + search["per_page"])
+    bills = snapshot["catalog"].records(snapshot["rows"][page])
+    for bill, score in zip(bills, snapshot["relevance_scores"][page].tolist()):
+        bill["relevance_score"] = score
+    return bills
+
+def empty_search_response(search):
+    """Response body when nothing matched the query"""
+    return {
+        "query": search["query"],
+        "bills": [],
+        "total_found": 0,
+        "page": search["page"],
+        "per_page": search["per_page"],
+        "has_more": False,
+        "message": "No relevant bills found for your query"
+    }
+
+def search_page_results(page_bills):
+    """Result entries for the page's bills, summarized but not yet enriched with details"""
+    summarize_started = time.perf_counter()
+    results = []
+    for bill in page_bills:
+        # Serve the stored abstractive summary; until it exists, use the
+        # fast extractive one and let the summarization worker fill it in
+        summary = summary_service.cached_summary(bill["number"])
+        if summary is None:
+            summary = create_fast_summary(bill["description"], bill["title"])
+            summary_service.submit(bill["number"])
+        
+        results.append({
+            "number": bill["number"],
+            "title": bill["title"],
+            "summary": summary,
+            "sponsor": "Loading...",
+            "status": "Loading...",
+            "date": "Loading...",
+            "relevance_score": bill["relevance_score"],
+            "url": bill["url"]
+        })
+    SEARCH_STAGE_SECONDS.observe(time.perf_counter() - summarize_started, stage="summarize")
+    return results
+
+def bill_detail_fields(details):
+    """The fields of a search result that come from the bill's detail lookup"""
+    return {"sponsor": details["sponsor"], "status": details["status"], "date": details["date"]}
+
+def search_page_info(search, snapshot):
+    """Paging fields of a search response"""
+    end_idx = search["start_idx"] + search["per_page"]
+    has_more = end_idx < len(snapshot["rows"])
+    return {
+        "query": search["query"],
+        "total_found": len(snapshot["rows"]),
+        "page": search["page"],
+        "per_page": search["per_page"],
+        "has_more": has_more,
+        "next_cursor": encode_cursor(snapshot["id"], end_idx) if has_more else None
+    }
+
+def search_response(search, snapshot, page_bills, page_details):
+    """Response body for one page of search results, given the page's bill details"""
+    if not len(snapshot["rows"]):
+        return empty_search_response(search)
+    
+    results = search_page_results(page_bills)
+    for result, details in zip(results, page_details):
+        result.update(bill_detail_fields(details))
     
+    # Sort results by date (newest first)
+    results.sort(key=lambda x: parse_date_for_sorting(x["date"]), reverse=True)
+    
+    logger.info("Returning search results", extra={"results": len(results), "page": search["page"]})
+    return {**search_page_info(search, snapshot), "bills": results}
+
+# Streamed searches (request body "stream": true) answer with newline-delimited
+# JSON events instead of one body:
+#   {"type": "results", ...paging fields, "bills": [...]}  ranked page, details "Loading..."
+#   {"type": "details", "number": ..., "sponsor", "status", "date"}  one per bill, as fetched
+#   {"type": "done"}  (or {"type": "error", "error": ...} if the stream fails part way)
+# Results arrive in rank order; clients re-sort by date once the details are in.
+SEARCH_STREAM_HEADERS = {
+    "Content-Type": "application/x-ndjson",
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no"  # keep reverse proxies from holding the events back
+}
+
+def search_stream_line(event):
+    return json.dumps(event) + "\n"
+
+def search_stream_results(search, snapshot, page_bills):
+    """First event of a streamed search: the ranked page before any detail lookups"""
+    if not len(snapshot["rows"]):
+        return {"type": "results", **empty_search_response(search)}
+    return {"type": "results", **search_page_info(search, snapshot), "bills": search_page_results(page_bills)}
+
+def search_stream_details(bill_number, details):
+    return {"type": "details", "number": bill_number, **bill_detail_fields(details)}
+
+def stream_search_bills(search, snapshot, page_bills):
+    """NDJSON events for a streamed search, each detail sent as soon as its fetch completes"""
     try:
-        # Try different date formats
-        import re
-        from datetime import datetime
+        yield search_stream_line(search_stream_results(search, snapshot, page_bills))
+        with SEARCH_STAGE_SECONDS.time(stage="detail_fanout"):
+            for bill_number, details in fetch_as_completed(fetch_bill_details, [b["number"] for b in page_bills]):
+                yield search_stream_line(search_stream_details(bill_number, details))
+        yield search_stream_line({"type": "done"})
+    except Exception:
+        logger.exception("Error streaming search results")
+        yield search_stream_line({"type": "error", "error": "Internal server error"})
+
+@app.route("/search_bills", methods=["POST"])
+def search_bills():
+    """Search for relevant bills based on query with pagination.
+    
+    Pages can be requested by number or with the next_cursor from a previous response.
+    With "stream": true the page is sent as NDJSON events (see SEARCH_STREAM_HEADERS).
+    An async variant of this handler is served by asgi.py.
+    """
+    try:
+        try:
+            search = parse_search_request(request.get_json())
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
-        # Format: YYYY-MM-DD
-        if re.match(r'\d{4}-\d{2}-\d{2}', date_str):
-            return date_str
+        try:
+            snapshot = load_search_snapshot(search)
+        except CursorExpired:
+            return jsonify(CURSOR_EXPIRED_ERROR), 410
+        if snapshot is None:
+            return jsonify({"error": "Unable to fetch bills from Congress API"}), 503
         
-        # Format: MM/DD/YYYY
-        match = re.match(r'(\d{1,2})/(\d{1,2})/(\d{4})', date_str)
-        if match:
-            month, day, year = match.groups()
-            return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+        # Fetch details for this page only, concurrently over the shared connection pool
+        page_bills = search_page_bills(search, snapshot)
+        if search["stream"]:
+            return Response(stream_search_bills(search, snapshot, page_bills), headers=SEARCH_STREAM_HEADERS)
         
-        # Format: Month DD, YYYY
-        try:
-            parsed = datetime.strptime(date_str, "%B %d, %Y")
-            return parsed.strftime("%Y-%m-%d")
-        except:
-            pass
+        logger.debug("Fetching bill details", extra={"bills": len(page_bills)})
+        with SEARCH_STAGE_SECONDS.time(stage="detail_fanout"):
+            page_details = fetch_concurrently(fetch_bill_details, [b["number"] for b in page_bills])
         
-        return "0000-00-00"
-    except:
-        return "0000-00-00"
+        return jsonify(search_response(search, snapshot, page_bills, page_details))
+    
+    except models.InferenceBusy as e:
+        return overloaded_response(e)
+    except Exception:
+        logger.exception("Error processing search request")
+        return jsonify({"error": "Internal server error"}), 500
+
+def track_bill_progression(bill_number):
+    """Track and store bill progression over time (only new actions are fetched)"""
+    return progression.track_bill_progression(bill_number)
+
+def generate_voting_heatmap_data(bill_number):
+    """Voting pattern data for heatmap visualization from imported House roll calls"""
+    return voting.get_state_aggregates(bill_number)
+
+def parse_date_for_sorting(date_str):
+    """Parse date string for sorting (newest first); unknown dates sort last"""
+    return parsing.normalize_date(date_str)
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus metrics for this process"""
+    return Response(observability.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
 
 @app.route("/health", methods=["GET"])
 def health():
     """Health check endpoint"""
-    return jsonify({"status": "healthy"})
+    return jsonify({
+        "status": "healthy",
+        "models": models.readiness(),
+        "caches": cache_stats()
+    })
 
 
 @app.route("/bill_progression", methods=["POST"])
@@ -572,19 +1110,97 @@ def get_bill_progression():
         if not bill_number:
             return jsonify({"error": "Bill number is required"}), 400
         
-        progression = track_bill_progression(bill_number)
+        # Served from the table unless the bill's upstream updateDate has moved
+        timeline = track_bill_progression(bill_number)
         
         return jsonify({
             "bill_number": bill_number,
-            "progression": progression,
-            "total_stages": len(progression)
+            "progression": timeline,
+            "total_stages": len(timeline)
         })
         
-    except Exception as e:
-        print(f"Error getting bill progression: {e}")
+    except Exception:
+        logger.exception("Error getting bill progression")
         return jsonify({"error": "Failed to get bill progression"}), 500
 
 
+# Upper bound on bills per batch request; a page of results is far below it
+MAX_BATCH_BILLS = int(os.getenv("MAX_BATCH_BILLS", "50"))
+
+def parse_bill_numbers(data):
+    """Validate a batch endpoint body's bill_numbers; raises ValueError with the client error"""
+    bill_numbers = (data or {}).get("bill_numbers")
+    if not isinstance(bill_numbers, list):
+        raise ValueError("bill_numbers must be a list")
+    
+    # Numbers go into Congress.gov paths and cache keys, so only plain H.R.
+    # numbers are accepted: ints or digit strings (bool is an int subclass)
+    normalized = []
+    for n in bill_numbers:
+        if isinstance(n, str):
+            n = n.strip()
+            if not n:
+                continue
+            valid = n.isascii() and n.isdigit()
+        else:
+            valid = isinstance(n, int) and not isinstance(n, bool)
+        if not valid or int(n) <= 0:
+            raise ValueError("bill_numbers must contain only positive bill numbers")
+        normalized.append(str(int(n)))
+
+    # Drop blanks and duplicates, keeping the caller's order
+    bill_numbers = list(dict.fromkeys(normalized))
+    if not bill_numbers:
+        raise ValueError("At least one bill number is required")
+    if len(bill_numbers) > MAX_BATCH_BILLS:
+        raise ValueError(f"At most {MAX_BATCH_BILLS} bills per request")
+    return bill_numbers
+
+def progressions_response(progressions):
+    return {
+        "progressions": {
+            bill_number: {"progression": timeline, "total_stages": len(timeline)}
+            for bill_number, timeline in progressions.items()
+        }
+    }
+
+def fetch_bill_details_batch(bill_numbers):
+    """{bill_number: details}; persisted cache entries are read in one query, misses fetched concurrently"""
+    fetch_bill_details.cache.preload_calls([(bill_number,) for bill_number in bill_numbers])
+    return dict(zip(bill_numbers, fetch_concurrently(fetch_bill_details, bill_numbers)))
+
+@app.route("/bill_progressions", methods=["POST"])
+def get_bill_progressions():
+    """Progression timelines for several bills (body: {"bill_numbers": [...]}) in one round trip"""
+    try:
+        try:
+            bill_numbers = parse_bill_numbers(request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        return jsonify(progressions_response(progression.track_bill_progressions(bill_numbers)))
+        
+    except Exception:
+        logger.exception("Error getting bill progressions")
+        return jsonify({"error": "Failed to get bill progressions"}), 500
+
+
+@app.route("/bill_details", methods=["POST"])
+def get_bill_details():
+    """Sponsor, status and date for several bills (body: {"bill_numbers": [...]})"""
+    try:
+        try:
+            bill_numbers = parse_bill_numbers(request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        return jsonify({"details": fetch_bill_details_batch(bill_numbers)})
+        
+    except Exception:
+        logger.exception("Error getting bill details")
+        return jsonify({"error": "Failed to get bill details"}), 500
+
+
 @app.route("/voting_heatmap", methods=["POST"])
 def get_voting_heatmap():
     """Get voting pattern data for heatmap"""
@@ -597,16 +1213,120 @@ def get_voting_heatmap():
         
         heatmap_data = generate_voting_heatmap_data(bill_number)
         
-        return jsonify({
+        response = {
             "bill_number": bill_number,
             "voting_data": heatmap_data,
             "data_type": "state_level"
-        })
+        }
+        if not heatmap_data:
+            response["message"] = "No House roll-call vote has been recorded for this bill"
+        return jsonify(response)
         
-    except Exception as e:
-        print(f"Error generating voting heatmap: {e}")
+    except Exception:
+        logger.exception("Error generating voting heatmap")
         return jsonify({"error": "Failed to generate voting heatmap"}), 500
 
 
+@app.route("/user_profile", methods=["POST"])
+def update_user_profile():
+    """Create or update a user's profile and feed preferences"""
+    try:
+        data = request.get_json()
+        user_id = data.get("user_id", "").strip()
+        
+        if not user_id:
+            return jsonify({"error": "User ID is required"}), 400
+        
+        topic_weights = data.get("topic_weights")
+        if topic_weights is not None and not isinstance(topic_weights, dict):
+            return jsonify({"error": "topic_weights must be an object of topic: weight"}), 400
+        
+        with db.transaction() as conn:
+            conn.execute('''
+                INSERT INTO user_profiles (user_id, location, age_group, income_bracket, interests)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET
+                    location = excluded.location,
+                    age_group = excluded.age_group,
+                    income_bracket = excluded.income_bracket,
+                    interests = excluded.interests,
+                    updated_at = CURRENT_TIMESTAMP
+            ''', (
+                user_id,
+                data.get("location", ""),
+                data.get("age_group", "adult"),
+                data.get("income_bracket", ""),
+                data.get("interests", "")
+            ))
+            conn.execute('''
+                INSERT INTO feed_preferences (user_id, notification_frequency, topic_weights)
+                VALUES (?, ?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET
+                    notification_frequency = excluded.notification_frequency,
+                    topic_weights = excluded.topic_weights
+            ''', (
+                user_id,
+                data.get("notification_frequency", "weekly"),
+                json.dumps(topic_weights or {})
+            ))
+        
+        return jsonify({"user_id": user_id, "status": "saved"})
+        
+    except Exception:
+        logger.exception("Error updating user profile")
+        return jsonify({"error": "Failed to update user profile"}), 500
+
+
+@app.route("/personalized_feed", methods=["POST"])
+def get_personalized_feed():
+    """Bills ranked against a user's interests, topic weights and location"""
+    try:
+        data = request.get_json()
+        user_id = data.get("user_id", "").strip()
+        top_k = data.get("top_k", 10)
+        
+        if not user_id:
+            return jsonify({"error": "User ID is required"}), 400
+        
+        # Same rule as page/per_page: bool is an int subclass, so reject it too
+        if not isinstance(top_k, int) or isinstance(top_k, bool) or top_k < 1:
+            return jsonify({"error": "top_k must be a positive integer"}), 400
+        top_k = min(top_k, 50)
+        
+        profiles = personalization.load_profiles(user_ids=[user_id])
+        if not profiles:
+            return jsonify({"error": "User profile not found"}), 404
+        
+        catalog = search_catalog()
+        bill_matrix = bill_embedding_store.matrix_for(catalog)
+        feed = personalization.rank_feeds(
+            profiles, catalog.numbers, bill_matrix, interest_embeddings, top_k
+        )[user_id]
+        
+        results = []
+        for row, score in feed:
+            bill = catalog.record(row)
+            bill["personalized_score"] = score
+            results.append(bill)
+        
+        response = {"user_id": user_id, "bills": results}
+        if not results:
+            response["message"] = "Add interests or topic weights to personalize this feed"
+        return jsonify(response)
+        
+    except models.InferenceBusy as e:
+        return overloaded_response(e)
+    except Exception:
+        logger.exception("Error building personalized feed")
+        return jsonify({"error": "Failed to build personalized feed"}), 500
+
+
 if __name__ == "__main__":
-    app.run(debug=True, host="0.0.0.0", port=5000)
\ No newline at end of file
+    # Development server only; serve production traffic with
+    #   gunicorn -c gunicorn.conf.py APP:app
+    app.run(
+        debug=os.getenv("FLASK_DEBUG", "0") == "1",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "5000")),
+        threaded=True
+    )
\ No newline at end of file
@@ -0,0 +1,192 @@
+"""ASGI entry point with async handlers for the upstream-bound endpoints.
+
+    uvicorn asgi:app --workers 2
+    gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi:app
+
+/search_bills, /bill_progression and the batch /bill_progressions and
+/bill_details are served by Quart handlers that await Congress.gov through
+httpx, so one worker keeps many upstream calls in flight instead of
+parking a thread on each. Ranking (embedding work) runs
+on a thread so it never blocks the event loop. Every other request,
+including CORS preflights, is passed through to the Flask app.
+"""
+import asyncio
+import logging
+import time
+
+from asgiref.wsgi import WsgiToAsgi
+from quart import Quart, g, jsonify, request
+
+import APP
+import models
+import progression
+from observability import HTTP_REQUEST_SECONDS, SEARCH_STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+async_app = Quart(__name__)
+flask_app = WsgiToAsgi(APP.app)
+
+ASYNC_ROUTES = {
+    ("POST", "/search_bills"),
+    ("POST", "/bill_progression"),
+    ("POST", "/bill_progressions"),
+    ("POST", "/bill_details")
+}
+
+
+async def app(scope, receive, send):
+    """Route the async endpoints to Quart and everything else to Flask"""
+    if scope["type"] == "lifespan" or (
+        scope["type"] == "http" and (scope["method"], scope["path"]) in ASYNC_ROUTES
+    ):
+        await async_app(scope, receive, send)
+    else:
+        await flask_app(scope, receive, send)
+
+
+@async_app.before_request
+async def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@async_app.after_request
+async def finish_response(response):
+    # Matches CORS(app) on the Flask side; preflights are answered by Flask
+    response.headers["Access-Control-Allow-Origin"] = "*"
+    started = g.pop("request_started", None)
+    if started is not None:
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            route=request.url_rule.rule if request.url_rule else "unmatched",
+            method=request.method,
+            status=response.status_code
+        )
+    return response
+
+
+def overloaded_response(e):
+    """503 with Retry-After when the inference pool sheds load"""
+    logger.warning("Shedding request", extra={"reason": str(e)})
+    response = jsonify({"error": "Server is busy, please retry shortly"})
+    response.status_code = 503
+    response.headers["Retry-After"] = "5"
+    return response
+
+
+async def stream_search_bills(search, snapshot, page_bills):
+    """Async variant of APP.stream_search_bills"""
+    try:
+        results = await asyncio.to_thread(APP.search_stream_results, search, snapshot, page_bills)
+        yield APP.search_stream_line(results)
+
+        async def fetch(bill_number):
+            return bill_number, await APP.fetch_bill_details_async(bill_number)
+
+        with SEARCH_STAGE_SECONDS.time(stage="detail_fanout"):
+            for next_done in asyncio.as_completed([fetch(bill["number"]) for bill in page_bills]):
+                bill_number, details = await next_done
+                yield APP.search_stream_line(APP.search_stream_details(bill_number, details))
+        yield APP.search_stream_line({"type": "done"})
+    except Exception:
+        logger.exception("Error streaming search results")
+        yield APP.search_stream_line({"type": "error", "error": "Internal server error"})
+
+
+@async_app.route("/search_bills", methods=["POST"])
+async def search_bills():
+    """Async variant of APP.search_bills"""
+    try:
+        try:
+            search = APP.parse_search_request(await request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # Ranking encodes the query and may wait on a single-flight fetch
+        try:
+            snapshot = await asyncio.to_thread(APP.load_search_snapshot, search)
+        except APP.CursorExpired:
+            return jsonify(APP.CURSOR_EXPIRED_ERROR), 410
+        if snapshot is None:
+            return jsonify({"error": "Unable to fetch bills from Congress API"}), 503
+
+        page_bills = APP.search_page_bills(search, snapshot)
+        if search["stream"]:
+            return stream_search_bills(search, snapshot, page_bills), 200, APP.SEARCH_STREAM_HEADERS
+
+        logger.debug("Fetching bill details", extra={"bills": len(page_bills)})
+        with SEARCH_STAGE_SECONDS.time(stage="detail_fanout"):
+            page_details = await asyncio.gather(*(
+                APP.fetch_bill_details_async(bill["number"]) for bill in page_bills
+            ))
+
+        # Summary lookups may read bill_summaries on first use
+        return jsonify(await asyncio.to_thread(APP.search_response, search, snapshot, page_bills, page_details))
+
+    except models.InferenceBusy as e:
+        return overloaded_response(e)
+    except Exception:
+        logger.exception("Error processing search request")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@async_app.route("/bill_progression", methods=["POST"])
+async def get_bill_progression():
+    """Async variant of APP.get_bill_progression"""
+    try:
+        data = await request.get_json(silent=True) or {}
+        bill_number = data.get("bill_number", "").strip()
+
+        if not bill_number:
+            return jsonify({"error": "Bill number is required"}), 400
+
+        # Served from the table unless the bill's upstream updateDate has moved
+        timeline = await progression.track_bill_progression_async(bill_number)
+
+        return jsonify({
+            "bill_number": bill_number,
+            "progression": timeline,
+            "total_stages": len(timeline)
+        })
+
+    except Exception:
+        logger.exception("Error getting bill progression")
+        return jsonify({"error": "Failed to get bill progression"}), 500
+
+
+@async_app.route("/bill_progressions", methods=["POST"])
+async def get_bill_progressions():
+    """Async variant of APP.get_bill_progressions"""
+    try:
+        try:
+            bill_numbers = APP.parse_bill_numbers(await request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        progressions = await progression.track_bill_progressions_async(bill_numbers)
+        return jsonify(APP.progressions_response(progressions))
+
+    except Exception:
+        logger.exception("Error getting bill progressions")
+        return jsonify({"error": "Failed to get bill progressions"}), 500
+
+
+@async_app.route("/bill_details", methods=["POST"])
+async def get_bill_details():
+    """Async variant of APP.get_bill_details"""
+    try:
+        try:
+            bill_numbers = APP.parse_bill_numbers(await request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # Persisted cache entries for the whole batch come back in one query
+        await asyncio.to_thread(
+            APP.fetch_bill_details.cache.preload_calls, [(n,) for n in bill_numbers]
+        )
+        details = await asyncio.gather(*(APP.fetch_bill_details_async(n) for n in bill_numbers))
+        return jsonify({"details": dict(zip(bill_numbers, details))})
+
+    except Exception:
+        logger.exception("Error getting bill details")
+        return jsonify({"error": "Failed to get bill details"}), 500
@@ -0,0 +1,618 @@
+"""Reproducible benchmarks for the search, summarization and progression pipelines.
+
+Endpoint benchmarks start the app against a fresh database and a local stub
+of the Congress.gov API that replays fixture responses, import synthetic
+House roll calls for the bills that passed the House, then drive
+/search_bills (first and later pages), /bill_progression and /voting_heatmap
+at a fixed concurrency. Micro-benchmarks time ranking (vector search plus
+rank fusion) at several corpus sizes, bill encoding keyed by the number of
+texts actually encoded (at most --encode-limit), and summarization once on a
+fixed set of documents.
+Everything is written to one JSON file; compare two runs with `compare`.
+
+    python benchmark.py record --bills 500           # capture fixtures from Congress.gov
+    python benchmark.py synthesize --bills 500       # or generate synthetic ones
+    python benchmark.py run --concurrency 16 --output before.json
+    python benchmark.py compare before.json after.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import re
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import requests
+
+FIXTURES_PATH = os.path.join("benchmark_fixtures", "congress_api.json")
+
+QUERY_TOPICS = [
+    "student loan forgiveness", "medicare prescription drug prices", "veterans health care",
+    "renewable energy tax credit", "border security funding", "small business loans",
+    "child care costs", "broadband internet access", "wildfire prevention",
+    "social security benefits", "affordable housing", "police reform", "farm subsidies",
+    "climate change emissions", "cybersecurity critical infrastructure", "opioid treatment"
+]
+
+STUB_ACTION_TEXTS = [
+    "Introduced in House", "Referred to the House Committee on Energy and Commerce.",
+    "Ordered to be Reported by Voice Vote.", "Passed/agreed to in House: On passage Passed by recorded vote.",
+    "Received in the Senate.", "Became Public Law."
+]
+
+
+# --- fixtures -------------------------------------------------------------
+
+def record_fixtures(num_bills, path):
+    """Capture bill list, detail, action and CRS summary responses from Congress.gov into a fixture file"""
+    from congress_client import api_get, fetch_concurrently
+
+    bills = []
+    while len(bills) < num_bills:
+        r = api_get("/bill/118/hr", {"limit": min(250, num_bills - len(bills)), "offset": len(bills),
+                                     "sort": "updateDate+desc"}, timeout=30)
+        r.raise_for_status()
+        page = r.json().get("bills", [])
+        if not page:
+            break
+        bills.extend(page)
+
+    def fetch(bill):
+        number = bill["number"]
+        details = api_get(f"/bill/118/hr/{number}").json().get("bill", {})
+        actions = api_get(f"/bill/118/hr/{number}/actions", {"limit": 250}).json().get("actions", [])
+        summaries = api_get(f"/bill/118/hr/{number}/summaries").json().get("summaries", [])
+        return number, details, actions, summaries
+
+    details, actions, summaries = {}, {}, {}
+    for number, bill_details, bill_actions, bill_summaries in fetch_concurrently(fetch, bills):
+        details[number] = bill_details
+        actions[number] = bill_actions
+        summaries[number] = bill_summaries
+
+    _write_fixtures(path, {"synthetic": False, "bills": bills, "details": details, "actions": actions,
+                           "summaries": summaries})
+
+
+def synthesize_fixtures(num_bills, path, seed=0):
+    """Deterministic synthetic fixtures in the recorded format, for machines without an API key"""
+    rng = random.Random(seed)
+    words = sorted({w for topic in QUERY_TOPICS for w in topic.split()})
+    bills, details, actions, summaries = [], {}, {}, {}
+    for n in range(1, num_bills + 1):
+        number = str(n)
+        topic = rng.choice(QUERY_TOPICS)
+        title = f"{topic.title()} Act of 2023: {' '.join(rng.sample(words, 4))}"
+        action_count = rng.randint(1, len(STUB_ACTION_TEXTS))
+        day = datetime(2023, 1, 3).toordinal() + rng.randint(0, 600)
+        dates = sorted(datetime.fromordinal(day + i * 7).strftime("%Y-%m-%d") for i in range(action_count))
+        bill_actions = [
+            {"actionDate": date, "text": text}
+            for date, text in zip(dates, STUB_ACTION_TEXTS)
+        ][::-1]  # newest first, like the API
+        latest = bill_actions[0]
+        bills.append({
+            "congress": 118, "type": "HR", "number": number, "title": title,
+            "latestAction": latest, "updateDate": f"{latest['actionDate']}T12:00:00Z",
+            "url": f"https://api.congress.gov/v3/bill/118/hr/{number}?format=json"
+        })
+        details[number] = {
+            "number": number, "title": title, "latestAction": latest,
+            "sponsors": [{"firstName": "Member", "lastName": f"Number{n % 435}",
+                          "party": rng.choice("DR"), "state": rng.choice(["CA", "TX", "NY", "FL", "OH"])}]
+        }
+        actions[number] = bill_actions
+        # CRS-style summary long enough to be condensed by the summarizer
+        summary_words = " ".join(rng.choice(words) for _ in range(rng.randint(90, 240)))
+        summaries[number] = [{
+            "actionDate": dates[0], "updateDate": f"{dates[0]}T12:00:00Z", "versionCode": "00",
+            "text": f"<p><strong>{title}</strong></p><p>This bill {summary_words}.</p>"
+        }]
+
+    _write_fixtures(path, {"synthetic": True, "bills": bills, "details": details, "actions": actions,
+                           "summaries": summaries})
+
+
+def _write_fixtures(path, fixtures):
+    fixtures["recorded_at"] = datetime.now(timezone.utc).isoformat()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(fixtures, f)
+    print(f"Wrote {len(fixtures['bills'])} bills to {path}")
+
+
+def load_fixtures(path):
+    if not os.path.exists(path):
+        sys.exit(f"No fixtures at {path}; run `python benchmark.py record` or `synthesize` first")
+    with open(path) as f:
+        return json.load(f)
+
+
+# --- stub Congress.gov server --------------------------------------------
+
+def _full_timestamp(value):
+    return value if "T" in value else f"{value}T00:00:00Z"
+
+
+def make_stub_handler(fixtures, latency_seconds):
+    bills = fixtures["bills"]
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if latency_seconds:
+                time.sleep(latency_seconds)
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            offset = int(params.get("offset", 0))
+            limit = int(params.get("limit", 20))
+
+            match = re.fullmatch(r"/v3/bill/\d+/hr/(\w+)/actions", url.path)
+            if match:
+                actions = fixtures["actions"].get(match.group(1), [])
+                return self._send(200, {"actions": actions[offset:offset + limit],
+                                        "pagination": {"count": len(actions)}})
+
+            match = re.fullmatch(r"/v3/bill/\d+/hr/(\w+)/summaries", url.path)
+            if match:
+                return self._send(200, {"summaries": fixtures.get("summaries", {}).get(match.group(1), [])})
+
+            match = re.fullmatch(r"/v3/bill/\d+/hr/(\w+)", url.path)
+            if match:
+                details = fixtures["details"].get(match.group(1))
+                if details is None:
+                    return self._send(404, {"error": "Unknown bill"})
+                return self._send(200, {"bill": details})
+
+            if re.fullmatch(r"/v3/bill/\d+/hr", url.path):
+                listed = bills
+                if "fromDateTime" in params:
+                    listed = [b for b in listed if _full_timestamp(b["updateDate"]) >= params["fromDateTime"]]
+                listed = sorted(listed, key=lambda b: b["updateDate"],
+                                reverse="asc" not in params.get("sort", "desc"))
+                page = listed[offset:offset + limit]
+                pagination = {"count": len(listed)}
+                if offset + limit < len(listed):
+                    pagination["next"] = f"{url.path}?offset={offset + limit}"
+                return self._send(200, {"bills": page, "pagination": pagination})
+
+            self._send(404, {"error": "Not found"})
+
+    return StubHandler
+
+
+def start_stub_server(fixtures, latency_seconds=0.0):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_stub_handler(fixtures, latency_seconds))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="congress-stub", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v3"
+
+
+# --- synthetic roll calls -------------------------------------------------
+
+ROLL_CALL_STATES = ["CA", "TX", "FL", "NY", "PA", "IL", "OH", "GA", "NC", "MI", "NJ", "VA", "WA", "AZ", "MA"]
+HOUSE_SIZE = 435
+
+
+def voted_bills(fixtures):
+    """Bills whose fixture actions include House passage, i.e. the ones a roll call exists for"""
+    return [
+        number for number, actions in fixtures["actions"].items()
+        if any("passed/agreed to in house" in action.get("text", "").lower() for action in actions)
+    ]
+
+
+def write_roll_calls(directory, bill_numbers, seed=0):
+    """One House Clerk-format roll-call XML file per bill, with a full House of synthetic members"""
+    rng = random.Random(seed)
+    members = [
+        (f"M{i:03d}", f"Member {i}", rng.choice("DR"), ROLL_CALL_STATES[i % len(ROLL_CALL_STATES)])
+        for i in range(HOUSE_SIZE)
+    ]
+    for roll_num, bill_number in enumerate(bill_numbers, start=1):
+        votes = "".join(
+            f'<recorded-vote><legislator name-id="{member_id}" party="{party}" state="{state}">{name}'
+            f'</legislator><vote>{rng.choice(["Yea", "Yea", "Nay", "Not Voting"])}</vote></recorded-vote>'
+            for member_id, name, party, state in members
+        )
+        with open(os.path.join(directory, f"roll{roll_num:04d}.xml"), "w") as f:
+            f.write(
+                f"<rollcall-vote><vote-metadata><congress>118</congress><session>1st</session>"
+                f"<rollcall-num>{roll_num}</rollcall-num><legis-num>H R {bill_number}</legis-num>"
+                f"<action-date>12-Jul-2023</action-date></vote-metadata>"
+                f"<vote-data>{votes}</vote-data></rollcall-vote>"
+            )
+
+
+def import_roll_calls(db_path, bill_numbers, seed=0):
+    """Load synthetic roll calls for bill_numbers into the app's database through voting.py"""
+    with tempfile.TemporaryDirectory() as directory:
+        write_roll_calls(directory, bill_numbers, seed)
+        voting_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "voting.py")
+        subprocess.run([sys.executable, voting_script, directory], check=True,
+                       env=dict(os.environ, BILL_TRACKER_DB=db_path))
+
+
+# --- app under test -------------------------------------------------------
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_app(server_cmd, api_base, db_path, expected_bills, timeout):
+    """Start the app on a fresh database and wait until the mirror and its embeddings are ready"""
+    port = _free_port()
+    env = dict(
+        os.environ,
+        PORT=str(port),
+        BILL_TRACKER_DB=db_path,
+        CONGRESS_API_BASE=api_base,
+        BILL_SYNC_ENABLED="1",
+        BILL_SYNC_INTERVAL="86400",
+        LOG_LEVEL=os.getenv("LOG_LEVEL", "WARNING")
+    )
+    command = server_cmd.format(python=sys.executable, port=port).split()
+    process = subprocess.Popen(command, env=env)
+    base_url = f"http://127.0.0.1:{port}"
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"App exited with status {process.returncode}")
+        try:
+            ready = requests.get(f"{base_url}/health", timeout=2).json()["models"]["ready"]
+            with sqlite3.connect(db_path) as conn:
+                bills = conn.execute("SELECT COUNT(*) FROM bills").fetchone()[0]
+                embedded = conn.execute("SELECT COUNT(*) FROM bill_embeddings").fetchone()[0]
+            if ready and bills >= expected_bills and embedded >= bills:
+                return process, base_url
+        except (requests.RequestException, sqlite3.Error, KeyError, ValueError):
+            pass
+        time.sleep(0.5)
+
+    process.terminate()
+    sys.exit(f"App was not ready within {timeout}s")
+
+
+# --- load generation ------------------------------------------------------
+
+def latency_summary(latencies, errors, wall_seconds):
+    latencies_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall_seconds, 2) if wall_seconds else None,
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies_ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 2),
+        "mean_ms": round(float(latencies_ms.mean()), 2)
+    }
+
+
+def run_load(url, make_payload, total_requests, concurrency):
+    """POST make_payload(i) for i in range(total_requests) from concurrency threads"""
+    counter = itertools.count()
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+
+    def worker():
+        session = requests.Session()
+        while True:
+            i = next(counter)
+            if i >= total_requests:
+                return
+            start = time.perf_counter()
+            try:
+                ok = session.post(url, json=make_payload(i), timeout=120).status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latency_summary(latencies, errors[0], time.perf_counter() - start)
+
+
+def benchmark_endpoints(base_url, fixtures, voted, total_requests, concurrency, seed):
+    rng = random.Random(seed)
+    numbers = [b["number"] for b in fixtures["bills"]]
+    results = {}
+
+    # Distinct queries so every first page is ranked, not served from the snapshot cache
+    first_page_queries = [f"{rng.choice(QUERY_TOPICS)} {i}" for i in range(total_requests)]
+    results["search_first_page"] = run_load(
+        f"{base_url}/search_bills",
+        lambda i: {"query": first_page_queries[i], "per_page": 5},
+        total_requests, concurrency
+    )
+
+    # Later pages follow cursors from already-ranked queries
+    cursors = []
+    for query in QUERY_TOPICS:
+        body = requests.post(f"{base_url}/search_bills", json={"query": query, "per_page": 5}, timeout=120).json()
+        if body.get("next_cursor"):
+            cursors.append((query, body["next_cursor"]))
+    if cursors:
+        results["search_later_pages"] = run_load(
+            f"{base_url}/search_bills",
+            lambda i: {"query": cursors[i % len(cursors)][0], "cursor": cursors[i % len(cursors)][1], "per_page": 5},
+            total_requests, concurrency
+        )
+
+    # First pass fetches actions from the stub; the second reads stored progression.
+    # Sampled without replacement so every cold request really is a bill's first.
+    progression_numbers = rng.sample(numbers, min(total_requests, len(numbers)))
+    for scenario in ("bill_progression_cold", "bill_progression_warm"):
+        results[scenario] = run_load(
+            f"{base_url}/bill_progression",
+            lambda i: {"bill_number": progression_numbers[i]},
+            len(progression_numbers), concurrency
+        )
+
+    # Only bills with an imported roll call, so every request reads real aggregates
+    if voted:
+        results["voting_heatmap"] = run_load(
+            f"{base_url}/voting_heatmap",
+            lambda i: {"bill_number": voted[i % len(voted)]},
+            total_requests, concurrency
+        )
+    return results
+
+
+# --- micro-benchmarks -----------------------------------------------------
+
+def synthetic_corpus(fixtures, size, seed=0):
+    """size bill texts built from the fixture titles, with variations past the fixture count"""
+    rng = random.Random(seed)
+    titles = [b["title"] for b in fixtures["bills"]] or QUERY_TOPICS
+    words = sorted({w for t in titles for w in t.split()})
+    return [
+        titles[i % len(titles)] if i < len(titles)
+        else f"{titles[i % len(titles)]} {' '.join(rng.sample(words, min(6, len(words))))}"
+        for i in range(size)
+    ]
+
+
+def timed_runs(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def benchmark_encoding(texts, batch_size=64):
+    import models
+    models.encode(texts[:batch_size])  # warm up
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        models.encode(texts[i:i + batch_size])
+    seconds = time.perf_counter() - start
+    query_samples = timed_runs(lambda: models.encode([random.choice(QUERY_TOPICS)]), 50)
+    return {
+        "texts": len(texts),
+        "bill_texts_per_second": round(len(texts) / seconds, 1),
+        "query_encode": latency_summary(query_samples, 0, sum(query_samples))
+    }
+
+
+def benchmark_ranking(size, dim=384, queries=200, candidates=200, seed=0):
+    from search_index import reciprocal_rank_fusion
+    from vector_index import ExactIndex, IVFIndex, evaluate_index
+
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(size, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [str(i) for i in range(size)]
+    query_vectors = vectors[rng.choice(size, min(queries, size), replace=False)]
+    query_vectors = query_vectors + rng.normal(scale=0.05, size=query_vectors.shape).astype(np.float32)
+
+    exact = ExactIndex()
+    exact.add(ids, vectors)
+    result = {"bills": size}
+    samples = [s for q in query_vectors for s in timed_runs(lambda: exact.search(q, candidates), 1)]
+    result["exact_search"] = latency_summary(samples, 0, sum(samples))
+
+    if size >= 1000:
+        start = time.perf_counter()
+        ivf = IVFIndex(min_train_size=1)
+        ivf.add(ids, vectors)
+        result["ivf_build_seconds"] = round(time.perf_counter() - start, 3)
+        result["ivf_vs_exact"] = evaluate_index(ivf, exact, query_vectors, k=10)
+
+    lexical = [str(i) for i in rng.choice(size, min(candidates, size), replace=False)]
+    semantic = exact.search(query_vectors[0], candidates)[0]
+    samples = timed_runs(lambda: reciprocal_rank_fusion(lexical, semantic), 200)
+    result["rank_fusion"] = latency_summary(samples, 0, sum(samples))
+    return result
+
+
+def benchmark_summarization(texts, batch_sizes=(1, 8)):
+    import models
+    words = " ".join(texts).split()
+    documents = [" ".join(words[i:i + 400]) for i in range(0, len(words) - 400, 400)][:max(batch_sizes) * 2]
+    if not documents:
+        return {"documents": 0}
+    summarizer = models.get_summarizer()
+    params = {"max_length": 200, "min_length": 80, "do_sample": False, "truncation": True}
+    summarizer(documents[:1], **params)  # warm up
+    result = {"documents": len(documents)}
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        for i in range(0, len(documents), batch_size):
+            summarizer(documents[i:i + batch_size], batch_size=batch_size, **params)
+        seconds = time.perf_counter() - start
+        result[f"batch_{batch_size}_docs_per_second"] = round(len(documents) / seconds, 3)
+    return result
+
+
+def run_micro(fixtures, sizes, encode_limit, skip_models):
+    results = {"ranking": {}}
+    for size in sizes:
+        results["ranking"][str(size)] = benchmark_ranking(size)
+    if not skip_models:
+        # Encoding cost is linear in corpus size, so sizes are capped at encode_limit
+        # and keyed by the texts actually encoded; capped sizes share one run
+        results["encoding"] = {}
+        for count in sorted({min(size, encode_limit) for size in sizes}):
+            results["encoding"][str(count)] = benchmark_encoding(synthetic_corpus(fixtures, count))
+        # Independent of corpus size: one fixed document set
+        results["summarization"] = benchmark_summarization(synthetic_corpus(fixtures, 2000))
+    return results
+
+
+# --- commands -------------------------------------------------------------
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    fixtures = load_fixtures(args.fixtures)
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "fixtures": {"path": args.fixtures, "bills": len(fixtures["bills"]),
+                         "synthetic": fixtures.get("synthetic", False),
+                         "roll_calls": len(voted_bills(fixtures))},
+            "args": vars(args)
+        }
+    }
+
+    if not args.skip_endpoints:
+        server, api_base = start_stub_server(fixtures, args.upstream_latency_ms / 1000)
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "bench.db")
+            process, base_url = start_app(
+                args.server_cmd, api_base, db_path, len(fixtures["bills"]), args.startup_timeout
+            )
+            try:
+                voted = voted_bills(fixtures)
+                import_roll_calls(db_path, voted, args.seed)
+                report["endpoints"] = benchmark_endpoints(
+                    base_url, fixtures, voted, args.requests, args.concurrency, args.seed
+                )
+                report["app_metrics"] = requests.get(f"{base_url}/metrics", timeout=10).text
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+        server.shutdown()
+
+    if not args.skip_micro:
+        sizes = [int(s) for s in args.sizes.split(",")]
+        report["micro"] = run_micro(fixtures, sizes, args.encode_limit, args.skip_models)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps({k: v for k, v in report.items() if k not in ("meta", "app_metrics")}, indent=2))
+    print(f"Wrote {args.output}")
+
+
+def _flatten(value, prefix=""):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _flatten(item, f"{prefix}.{key}" if prefix else key)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield prefix, value
+
+
+def compare(args):
+    """Print every numeric result that appears in both runs with its relative change"""
+    with open(args.baseline) as f:
+        baseline = dict(_flatten({k: v for k, v in json.load(f).items() if k not in ("meta", "app_metrics")}))
+    with open(args.candidate) as f:
+        candidate = dict(_flatten({k: v for k, v in json.load(f).items() if k not in ("meta", "app_metrics")}))
+    for key in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[key], candidate[key]
+        change = f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+        print(f"{key:70} {before:>12} {after:>12} {change:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", default=FIXTURES_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="capture fixtures from Congress.gov (needs CONGRESS_API_KEY)")
+    record.add_argument("--bills", type=int, default=500)
+
+    synthesize = commands.add_parser("synthesize", help="generate synthetic fixtures")
+    synthesize.add_argument("--bills", type=int, default=500)
+    synthesize.add_argument("--seed", type=int, default=0)
+
+    bench = commands.add_parser("run", help="run the benchmarks and write a JSON report")
+    bench.add_argument("--concurrency", type=int, default=8)
+    bench.add_argument("--requests", type=int, default=200, help="requests per endpoint scenario")
+    bench.add_argument("--upstream-latency-ms", type=float, default=0.0,
+                       help="delay added to every stub Congress.gov response")
+    bench.add_argument("--server-cmd", default="{python} APP.py",
+                       help="command that serves the app on $PORT, e.g. "
+                            "'gunicorn -c gunicorn.conf.py APP:app'")
+    bench.add_argument("--startup-timeout", type=float, default=600)
+    bench.add_argument("--sizes", default="100,10000,100000", help="corpus sizes for micro-benchmarks")
+    bench.add_argument("--encode-limit", type=int, default=2000,
+                       help="most bill texts encoded; encoding results are keyed by the count encoded")
+    bench.add_argument("--skip-endpoints", action="store_true")
+    bench.add_argument("--skip-micro", action="store_true")
+    bench.add_argument("--skip-models", action="store_true", help="skip encoding and summarization micro-benchmarks")
+    bench.add_argument("--seed", type=int, default=0)
+    bench.add_argument("--output", default="benchmark-results.json")
+
+    diff = commands.add_parser("compare", help="compare two JSON reports")
+    diff.add_argument("baseline")
+    diff.add_argument("candidate")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record_fixtures(args.bills, args.fixtures)
+    elif args.command == "synthesize":
+        synthesize_fixtures(args.bills, args.fixtures, args.seed)
+    elif args.command == "run":
+        run(args)
+    else:
+        compare(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Columnar in-memory bill catalog.
+
+Each field is one tuple, aligned row-for-row with the others and with the
+matrix BillEmbeddingStore.matrix_for returns for the catalog, so ranking
+works on row indices and bill dicts are only built for the bills actually
+returned. Strings that repeat across many bills (latest action text and
+dates) are interned so the catalog holds one copy of each.
+"""
+import sys
+
+import numpy as np
+
+from embedding_store import content_hash
+
+FIELDS = ("number", "title", "description", "latest_action", "latest_action_date", "update_date", "url")
+
+# Columns with few distinct values across the catalog
+_INTERNED = {"latest_action", "latest_action_date", "update_date"}
+
+
+def _column(values, intern):
+    if intern:
+        return tuple(sys.intern(v) if isinstance(v, str) else v for v in values)
+    return tuple(values)
+
+
+class BillCatalog:
+    """Immutable struct-of-arrays view of the bill list; build a new one when bills change"""
+
+    def __init__(self, rows):
+        """rows: iterable of tuples in FIELDS order"""
+        columns = list(zip(*rows)) or [()] * len(FIELDS)
+        (numbers, self.titles, self.descriptions, self.latest_actions,
+         self.latest_action_dates, self.update_dates, self.urls) = (
+            _column(values, field in _INTERNED) for field, values in zip(FIELDS, columns)
+        )
+        self.numbers = tuple(map(str, numbers))
+        self.row_of = {bill_number: row for row, bill_number in enumerate(self.numbers)}
+        self._content_hashes = None
+
+    @classmethod
+    def from_bills(cls, bills):
+        """Catalog from a list of bill dicts (as returned by bill_from_api)"""
+        return cls(tuple(bill.get(field, "") for field in FIELDS) for bill in bills)
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def record(self, row):
+        """The bill at row as a fresh dict"""
+        return {
+            "number": self.numbers[row],
+            "title": self.titles[row],
+            "description": self.descriptions[row],
+            "latest_action": self.latest_actions[row],
+            "latest_action_date": self.latest_action_dates[row],
+            "update_date": self.update_dates[row],
+            "url": self.urls[row]
+        }
+
+    def records(self, rows):
+        return [self.record(int(row)) for row in rows]
+
+    def rows_for(self, bill_numbers):
+        """Rows of the given bill numbers, in order; numbers not in the catalog are dropped"""
+        rows = [self.row_of[n] for n in bill_numbers if n in self.row_of]
+        return np.array(rows, dtype=np.int64)
+
+    @property
+    def content_hashes(self):
+        """Per-row embedding content hashes, computed once per catalog"""
+        if self._content_hashes is None:
+            self._content_hashes = tuple(map(content_hash, self.titles, self.descriptions))
+        return self._content_hashes
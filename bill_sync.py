@@ -0,0 +1,207 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+import db
+from bill_catalog import BillCatalog
+from congress_client import api_get
+
+logger = logging.getLogger(__name__)
+
+CONGRESS = 118
+BILL_TYPE = "hr"
+PAGE_SIZE = 250  # Congress.gov maximum
+
+
+def bill_from_api(bill):
+    """Convert a Congress.gov bill list entry into the app's bill dict"""
+    title = bill.get("title", "")
+    bill_number = bill.get("number", "")
+
+    # Create description for semantic search
+    description = title
+    latest_action = bill.get("latestAction") or {}
+    if latest_action:
+        description += f" {latest_action.get('text', '')}"
+
+    return {
+        "number": bill_number,
+        "title": title,
+        "description": description,
+        "latest_action": latest_action.get("text", ""),
+        "latest_action_date": latest_action.get("actionDate", ""),
+        "update_date": bill.get("updateDate", ""),
+        "url": f"https://www.congress.gov/bill/{CONGRESS}th-congress/house-bill/{bill_number}"
+    }
+
+
+def _get_state(conn, key):
+    row = conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def _set_state(conn, key, value):
+    conn.execute('''
+        INSERT INTO sync_state (key, value, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = CURRENT_TIMESTAMP
+    ''', (key, value))
+
+
+def sync_bills():
+    """Page through every bill updated since the last sync into the bills table.
+
+    Pages are requested oldest-update-first and the high-water mark is saved
+    after each page, so an interrupted sync resumes where it stopped.
+    Bills land in bills_staged; publish_staged_bills moves them into bills.
+    Returns the number of bills written.
+    """
+    conn = db.get_connection()
+    written = 0
+
+    try:
+        since = _get_state(conn, "bills_update_date")
+        offset = 0
+
+        while True:
+            params = {
+                "limit": PAGE_SIZE,
+                "offset": offset,
+                "sort": "updateDate+asc"
+            }
+            if since:
+                # fromDateTime must be a full timestamp; list entries may carry a bare date
+                params["fromDateTime"] = since if "T" in since else f"{since}T00:00:00Z"
+
+            r = api_get(f"/bill/{CONGRESS}/{BILL_TYPE}", params, timeout=30)
+            r.raise_for_status()
+            payload = r.json()
+            page = [bill_from_api(b) for b in payload.get("bills", [])]
+
+            if page:
+                conn.executemany('''
+                    INSERT OR REPLACE INTO bills_staged
+                    (bill_number, congress, bill_type, title, description,
+                     latest_action, latest_action_date, update_date, url)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [
+                    (b["number"], CONGRESS, BILL_TYPE, b["title"], b["description"],
+                     b["latest_action"], b["latest_action_date"], b["update_date"], b["url"])
+                    for b in page
+                ])
+                newest = max(b["update_date"] for b in page)
+                if newest and (not since or newest > since):
+                    _set_state(conn, "bills_update_date", newest)
+                written += len(page)
+            conn.commit()
+
+            if not page or not payload.get("pagination", {}).get("next"):
+                break
+            offset += len(page)
+    except BaseException:
+        conn.rollback()
+        raise
+
+    return written
+
+
+_catalog_cache = {"stamp": None, "catalog": BillCatalog(())}
+_catalog_cache_lock = threading.Lock()
+
+
+_CATALOG_COLUMNS = "bill_number, title, description, latest_action, latest_action_date, update_date, url"
+
+
+def staged_catalog():
+    """The catalog as it will be once staged bills are published, or None if nothing is staged"""
+    conn = db.get_connection()
+    if conn.execute("SELECT 1 FROM bills_staged LIMIT 1").fetchone() is None:
+        return None
+    rows = conn.execute(f'''
+        SELECT {_CATALOG_COLUMNS} FROM bills
+        WHERE bill_number NOT IN (SELECT bill_number FROM bills_staged)
+        UNION ALL
+        SELECT {_CATALOG_COLUMNS} FROM bills_staged
+        ORDER BY update_date DESC
+    ''')
+    return BillCatalog(rows)
+
+
+def publish_staged_bills(catalog):
+    """Move staged bills into bills in one transaction and serve catalog (from staged_catalog) in this process"""
+    conn = db.get_connection()
+    stamp = datetime.now(timezone.utc).isoformat()
+    try:
+        conn.execute('''
+            INSERT INTO bills
+            (bill_number, congress, bill_type, title, description,
+             latest_action, latest_action_date, update_date, url, synced_at)
+            SELECT bill_number, congress, bill_type, title, description,
+                   latest_action, latest_action_date, update_date, url, CURRENT_TIMESTAMP
+            FROM bills_staged WHERE true
+            ON CONFLICT(bill_number) DO UPDATE SET
+                title = excluded.title,
+                description = excluded.description,
+                latest_action = excluded.latest_action,
+                latest_action_date = excluded.latest_action_date,
+                update_date = excluded.update_date,
+                url = excluded.url,
+                synced_at = CURRENT_TIMESTAMP
+        ''')
+        conn.execute("DELETE FROM bills_staged")
+        _set_state(conn, "bills_synced_at", stamp)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    with _catalog_cache_lock:
+        _catalog_cache["stamp"] = stamp
+        _catalog_cache["catalog"] = catalog
+
+
+def load_catalog():
+    """Return the mirrored bills as a BillCatalog, newest update first.
+
+    The catalog is cached in-process and only re-read after a sync has published.
+    """
+    conn = db.get_connection()
+    stamp = _get_state(conn, "bills_synced_at")
+    with _catalog_cache_lock:
+        if stamp is not None and stamp == _catalog_cache["stamp"]:
+            return _catalog_cache["catalog"]
+
+        rows = conn.execute(f"SELECT {_CATALOG_COLUMNS} FROM bills ORDER BY update_date DESC")
+        catalog = BillCatalog(rows)
+
+        _catalog_cache["stamp"] = stamp
+        _catalog_cache["catalog"] = catalog
+        return catalog
+
+
+def start_sync_worker(interval_seconds=900, on_update=None):
+    """Run sync_bills forever on a daemon thread.
+
+    on_update, if given, is called with the new BillCatalog before staged
+    bills are published (used to pre-compute embeddings off the request path),
+    so searches keep the previous catalog until it returns. If it fails,
+    the bills stay staged and the next run retries.
+    """
+    def run():
+        while True:
+            try:
+                written = sync_bills()
+                logger.info("Bill sync complete", extra={"bills_updated": written})
+                # Also picks up bills left staged by an earlier failed run
+                catalog = staged_catalog()
+                if catalog is not None:
+                    if on_update:
+                        on_update(catalog)
+                    publish_staged_bills(catalog)
+                    logger.info("Published synced bills", extra={"bills": len(catalog)})
+            except Exception:
+                logger.exception("Error syncing bills")
+            time.sleep(interval_seconds)
+
+    thread = threading.Thread(target=run, name="bill-sync", daemon=True)
+    thread.start()
+    return thread
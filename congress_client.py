@@ -0,0 +1,115 @@
+import asyncio
+import os
+import re
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from observability import UPSTREAM_ERRORS, UPSTREAM_REQUEST_SECONDS
+
+# Overridable so benchmarks can point the app at a local stub server
+API_BASE = os.getenv("CONGRESS_API_BASE", "https://api.congress.gov/v3")
+
+# Load API key from environment variable for security
+API_KEY = os.getenv("CONGRESS_API_KEY", "Im5PSE4YRX9G2FZhVchtfXnwNuRQ9oKmU1G6YztB")
+
+# Upper bound on simultaneous upstream requests from this process
+MAX_CONCURRENCY = int(os.getenv("CONGRESS_API_CONCURRENCY", "8"))
+
+# One keep-alive session for every Congress.gov call, so requests reuse
+# pooled TLS connections instead of handshaking each time
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONCURRENCY))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="congress-api")
+
+# Connection cap for the async client; requests beyond it wait on the pool
+# rather than holding a worker thread each
+ASYNC_MAX_CONNECTIONS = int(os.getenv("CONGRESS_API_ASYNC_CONNECTIONS", "100"))
+
+_async_clients = weakref.WeakKeyDictionary()  # event loop -> httpx.AsyncClient
+
+
+def endpoint_label(path):
+    """Metric label for an API path, e.g. /bill/118/hr/815/actions -> /bill/{n}/hr/{n}/actions"""
+    return re.sub(r"/\d+", "/{n}", path)
+
+
+def _record(endpoint, start, response=None, error=None):
+    UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+    if error is not None:
+        UPSTREAM_ERRORS.inc(endpoint=endpoint, reason=type(error).__name__)
+    elif response.status_code >= 400:
+        UPSTREAM_ERRORS.inc(endpoint=endpoint, reason=str(response.status_code))
+
+
+def api_get(path, params=None, timeout=10):
+    """GET a Congress.gov v3 path (e.g. "/bill/118/hr/815") through the shared session"""
+    query = {"api_key": API_KEY}
+    if params:
+        query.update(params)
+    start = time.perf_counter()
+    try:
+        response = session.get(f"{API_BASE}{path}", params=query, timeout=timeout)
+    except Exception as e:
+        _record(endpoint_label(path), start, error=e)
+        raise
+    _record(endpoint_label(path), start, response=response)
+    return response
+
+
+def fetch_concurrently(fn, items):
+    """Apply fn to every item on the shared worker pool, preserving input order.
+
+    Concurrency is capped at MAX_CONCURRENCY across all callers, so a page of
+    N lookups costs roughly one round trip instead of N. fn should handle its
+    own errors; an exception propagates to the caller.
+    """
+    items = list(items)
+    if len(items) <= 1:
+        return [fn(item) for item in items]
+    return list(_executor.map(fn, items))
+
+
+def fetch_as_completed(fn, items):
+    """Like fetch_concurrently, but yield (item, result) pairs as each call finishes"""
+    futures = {_executor.submit(fn, item): item for item in items}
+    try:
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        # A client that disconnects mid-stream leaves nothing queued behind it
+        for future in futures:
+            future.cancel()
+
+
+def _async_client():
+    """Keep-alive httpx client for the running event loop (clients are bound to one loop)"""
+    import httpx
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(limits=httpx.Limits(
+            max_connections=ASYNC_MAX_CONNECTIONS,
+            max_keepalive_connections=ASYNC_MAX_CONNECTIONS
+        ))
+        _async_clients[loop] = client
+    return client
+
+
+async def async_api_get(path, params=None, timeout=10):
+    """api_get for async handlers: awaits the response instead of blocking a thread"""
+    query = {"api_key": API_KEY}
+    if params:
+        query.update(params)
+    start = time.perf_counter()
+    try:
+        response = await _async_client().get(f"{API_BASE}{path}", params=query, timeout=timeout)
+    except Exception as e:
+        _record(endpoint_label(path), start, error=e)
+        raise
+    _record(endpoint_label(path), start, response=response)
+    return response
@@ -0,0 +1,144 @@
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = os.getenv("BILL_TRACKER_DB", "bill_tracker.db")
+
+_local = threading.local()
+
+
+def _connect():
+    conn = sqlite3.connect(DB_PATH, timeout=30, cached_statements=256)
+    # WAL lets readers proceed while a writer commits; NORMAL sync is safe under WAL
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+def get_connection():
+    """Return this thread's pooled connection to bill_tracker.db.
+
+    Each thread keeps one connection for its lifetime, so statements stay in
+    sqlite3's prepared-statement cache. Connections are reopened after a fork.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.pid != os.getpid():
+        conn = _connect()
+        _local.conn = conn
+        _local.pid = os.getpid()
+    return conn
+
+
+@contextmanager
+def transaction():
+    """Yield the thread's connection; commit on success, roll back on error"""
+    conn = get_connection()
+    with conn:
+        yield conn
+
+
+def query(sql, params=()):
+    """Run a read query on the thread's connection and return all rows"""
+    return get_connection().execute(sql, params).fetchall()
+
+
+def execute_many(sql, rows):
+    """Write a batch of rows in a single transaction"""
+    with transaction() as conn:
+        conn.executemany(sql, rows)
+
+
+_process_locks = {}
+
+
+def try_process_lock(name):
+    """Take a non-blocking exclusive lock file next to the database for the life of this process.
+
+    Lets exactly one of several server processes run a singleton job such as
+    the bill sync; the lock is released when the holder exits. Always True
+    where fcntl is unavailable (single-process dev server on Windows).
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return True
+    if name in _process_locks:
+        return True
+    handle = open(f"{DB_PATH}.{name}.lock", "a")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return False
+    _process_locks[name] = handle
+    return True
+
+
+class BufferedWriter:
+    """Collects rows for one INSERT statement and writes them in batches.
+
+    write() never touches the database; a daemon thread flushes the buffer
+    with executemany every flush_interval seconds, or sooner once max_batch
+    rows are waiting.
+    """
+
+    def __init__(self, sql, flush_interval=1.0, max_batch=500):
+        self.sql = sql
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        atexit.register(self.flush_pending)
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+        return self
+
+    def write(self, row):
+        self._queue.put(row)
+
+    def _drain(self, first):
+        rows = [first]
+        while len(rows) < self.max_batch:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def flush_pending(self):
+        """Synchronously write whatever is still buffered (called at exit)"""
+        while True:
+            try:
+                first = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            self.flush(self._drain(first))
+
+    def flush(self, rows):
+        try:
+            execute_many(self.sql, rows)
+        except sqlite3.Error as e:
+            logger.error("Error flushing buffered rows", extra={"rows": len(rows), "error": str(e)})
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            # Give other writers a moment to join this batch unless it is already full
+            if self._queue.qsize() + 1 < self.max_batch:
+                time.sleep(self.flush_interval)
+            self.flush(self._drain(first))
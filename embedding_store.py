@@ -0,0 +1,283 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import db
+from observability import Counter
+
+logger = logging.getLogger(__name__)
+
+QUERY_EMBEDDING_LOOKUPS = Counter(
+    "query_embedding_cache_total", "Query embedding lookups by where they were served from", ["result"]
+)
+
+
+def content_hash(title, description):
+    """Hash the fields that feed a bill's embedding so edits trigger a re-encode"""
+    content = f"{title or ''}\n{description or ''}"
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def embedding_text(title, description):
+    """Text that gets embedded for a bill"""
+    return f"{title} {description}"
+
+
+def normalize_rows(vectors):
+    """L2-normalize rows so a dot product equals cosine similarity"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors.reshape(1, -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class BillEmbeddingStore:
+    """Normalized bill embeddings persisted as float32 BLOBs in bill_tracker.db
+
+    In memory there is one matrix, aligned row-for-row with the most recent
+    BillCatalog, plus each bill's row in it; stored vectors are read straight
+    into that matrix. If an index (see vector_index) is attached, it is kept
+    in sync with the catalog: new or changed bills are added, dropped bills
+    removed. Without one, callers score the matrix directly.
+    """
+
+    def __init__(self, encode, index=None):
+        self.encode = encode
+        self.index = index
+        self._rows = {}  # bill_number -> (content_hash, row in _matrix)
+        self._indexed = {}  # bill_number -> content_hash currently in the index
+        self._matrix_key = None
+        self._matrix_catalog = None
+        self._matrix = None
+        self._lock = threading.Lock()  # guards the published matrix
+        self._build_lock = threading.Lock()  # one rebuild at a time
+
+    def _load_stored(self, bill_numbers=None, chunk_size=500):
+        """{bill_number: (content_hash, vector)} of stored embeddings, for every bill or only the given ones"""
+        if bill_numbers is None:
+            rows = db.query("SELECT bill_number, content_hash, dim, embedding FROM bill_embeddings")
+        else:
+            rows = []
+            for start in range(0, len(bill_numbers), chunk_size):
+                chunk = bill_numbers[start:start + chunk_size]
+                rows += db.query(f'''
+                    SELECT bill_number, content_hash, dim, embedding FROM bill_embeddings
+                    WHERE bill_number IN ({",".join("?" * len(chunk))})
+                ''', tuple(chunk))
+
+        stored = {}
+        for bill_number, content_hash, dim, blob in rows:
+            vector = np.frombuffer(blob, dtype=np.float32)
+            if vector.shape[0] == dim:
+                stored[bill_number] = (content_hash, vector)
+        return stored
+
+    def _save(self, entries):
+        """Persist newly encoded embeddings in a single transaction"""
+        db.execute_many('''
+            INSERT OR REPLACE INTO bill_embeddings
+            (bill_number, content_hash, dim, embedding)
+            VALUES (?, ?, ?, ?)
+        ''', [
+            (bill_number, content_hash, int(vector.shape[0]), vector.tobytes())
+            for bill_number, content_hash, vector in entries
+        ])
+
+    def matrix_for(self, catalog):
+        """Return a normalized (len(catalog), dim) matrix aligned row-for-row with the BillCatalog.
+
+        Rows are copied from the previous matrix or read from bill_embeddings;
+        only bills that are new or whose title/description changed are
+        encoded. Rebuilds hold their own lock, so searches against the
+        current matrix never wait behind a rebuild or an encode.
+        """
+        with self._lock:
+            if catalog is self._matrix_catalog:
+                return self._matrix
+
+        with self._build_lock:
+            key = tuple(zip(catalog.numbers, catalog.content_hashes))
+            with self._lock:
+                if key == self._matrix_key:
+                    self._matrix_catalog = catalog
+                    return self._matrix
+
+            # Bills the previous matrix has no current row for: read them from
+            # the table (another process may have encoded them), else encode
+            missing = [i for i, entry in enumerate(key) if self._rows.get(entry[0], (None,))[0] != entry[1]]
+            stored = self._load_stored(None if self._matrix is None else [key[i][0] for i in missing])
+            to_encode = [i for i in missing if stored.get(key[i][0], (None,))[0] != key[i][1]]
+
+            if to_encode:
+                encoded = normalize_rows(self.encode([
+                    embedding_text(catalog.titles[i], catalog.descriptions[i]) for i in to_encode
+                ]))
+                entries = [(key[i][0], key[i][1], encoded[row]) for row, i in enumerate(to_encode)]
+                try:
+                    self._save(entries)
+                except sqlite3.Error as e:
+                    logger.error("Error saving bill embeddings", extra={"error": str(e)})
+                stored.update((bill_number, (content_hash, vector)) for bill_number, content_hash, vector in entries)
+
+            matrix = self._assemble(key, missing, stored)
+            with self._lock:
+                self._matrix = matrix
+                self._rows = {bill_number: (content_hash, row) for row, (bill_number, content_hash) in enumerate(key)}
+                self._matrix_key = key
+                self._matrix_catalog = catalog
+                if self.index is not None:
+                    self._sync_index(key)
+            return matrix
+
+    def _assemble(self, key, missing, stored):
+        """New matrix for key: kept rows copied from the current matrix in one gather, missing ones from stored"""
+        if self._matrix is not None:
+            dim = self._matrix.shape[1]
+        else:
+            dim = next(iter(stored.values()))[1].shape[0] if stored else 0
+        matrix = np.empty((len(key), dim), dtype=np.float32)
+        kept = np.ones(len(key), dtype=bool)
+        kept[missing] = False
+        kept_rows = np.flatnonzero(kept)
+        if len(kept_rows):
+            old_rows = np.fromiter((self._rows[key[i][0]][1] for i in kept_rows), dtype=np.int64, count=len(kept_rows))
+            matrix[kept_rows] = self._matrix[old_rows]
+        for i in missing:
+            matrix[i] = stored[key[i][0]][1]
+        return matrix
+
+    def _sync_index(self, key):
+        """Apply the difference between the indexed bills and key to the index. Caller holds the lock."""
+        current = dict(key)
+        removed = [bill_number for bill_number in self._indexed if bill_number not in current]
+        changed = [
+            bill_number for bill_number, content_hash in key
+            if self._indexed.get(bill_number) != content_hash
+        ]
+
+        if removed:
+            self.index.remove(removed)
+            for bill_number in removed:
+                del self._indexed[bill_number]
+        if changed:
+            self.index.add(changed, self._matrix[[self._rows[n][1] for n in changed]])
+            for bill_number in changed:
+                self._indexed[bill_number] = current[bill_number]
+
+
+class QueryEmbeddingCache:
+    """Bounded LRU of normalized query embeddings, persisted in the query_embeddings table.
+
+    Keys are normalized query text. A miss checks the table before running
+    the model, so popular queries survive restarts; newly encoded vectors
+    are written in the background. Warming trims the table back to
+    max_entries rows, least recently updated first.
+    """
+
+    def __init__(self, encode, max_entries=10000, flush_interval=1.0):
+        self.encode = encode
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # query -> normalized vector
+        self._lock = threading.Lock()
+        self._writer = db.BufferedWriter('''
+            INSERT OR REPLACE INTO query_embeddings (query, dim, embedding)
+            VALUES (?, ?, ?)
+        ''', flush_interval=flush_interval)
+
+    def start(self):
+        self._writer.start()
+        return self
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remember(self, query, vector):
+        """Insert into the LRU, evicting the least recently used. Caller holds the lock."""
+        self._entries[query] = vector
+        self._entries.move_to_end(query)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load_stored(self, queries, chunk_size=500):
+        stored = {}
+        for start in range(0, len(queries), chunk_size):
+            chunk = queries[start:start + chunk_size]
+            rows = db.query(
+                f"SELECT query, dim, embedding FROM query_embeddings WHERE query IN ({','.join('?' * len(chunk))})",
+                tuple(chunk)
+            )
+            for query, dim, blob in rows:
+                vector = np.frombuffer(blob, dtype=np.float32)
+                if vector.shape[0] == dim:
+                    stored[query] = vector
+        return stored
+
+    def _prune(self, popular, chunk_size=500):
+        """Refresh updated_at for popular stored queries, then trim the table to max_entries rows"""
+        with db.transaction() as conn:
+            for start in range(0, len(popular), chunk_size):
+                chunk = popular[start:start + chunk_size]
+                conn.execute(
+                    "UPDATE query_embeddings SET updated_at = CURRENT_TIMESTAMP "
+                    f"WHERE query IN ({','.join('?' * len(chunk))})",
+                    chunk
+                )
+            return conn.execute('''
+                DELETE FROM query_embeddings
+                WHERE query NOT IN (
+                    SELECT query FROM query_embeddings ORDER BY updated_at DESC LIMIT ?
+                )
+            ''', (self.max_entries,)).rowcount
+
+    def _encode(self, queries, encode=None):
+        vectors = normalize_rows((encode or self.encode)(queries))
+        for query, vector in zip(queries, vectors):
+            self._writer.write((query, int(vector.shape[0]), vector.tobytes()))
+        return vectors
+
+    def get(self, query):
+        """Normalized embedding for a normalized query, encoding it only if never seen"""
+        with self._lock:
+            vector = self._entries.get(query)
+            if vector is not None:
+                self._entries.move_to_end(query)
+                QUERY_EMBEDDING_LOOKUPS.inc(result="memory")
+                return vector
+
+        vector = self._load_stored([query]).get(query)
+        if vector is not None:
+            QUERY_EMBEDDING_LOOKUPS.inc(result="stored")
+        else:
+            vector = self._encode([query])[0]
+            QUERY_EMBEDDING_LOOKUPS.inc(result="encoded")
+
+        with self._lock:
+            self._remember(query, vector)
+        return vector
+
+    def warm(self, queries, encode=None):
+        """Load or batch-encode embeddings for queries, most popular first. Returns how many were encoded.
+
+        encode overrides the cache's encoder, e.g. to bypass a request-path pool.
+        """
+        queries = list(dict.fromkeys(queries))[:self.max_entries]
+        stored = self._load_stored(queries)
+        pruned = self._prune(list(stored))
+        if pruned:
+            logger.info("Pruned stored query embeddings", extra={"pruned": pruned})
+        missing = [q for q in queries if q not in stored]
+        if missing:
+            stored.update(zip(missing, self._encode(missing, encode)))
+
+        with self._lock:
+            # Least popular first, so the most popular end up most recently used
+            for query in reversed(queries):
+                if query not in self._entries:
+                    self._remember(query, stored[query])
+        return len(missing)
@@ -0,0 +1,45 @@
+"""Production server settings: gunicorn -c gunicorn.conf.py APP:app
+
+Each worker process serves requests on a pool of I/O threads (gthread).
+Model calls on the request path run on a separate bounded inference pool
+inside each worker (models.InferencePool), so a slow MiniLM or BART call
+never ties up every request thread; once that pool's queue is full,
+requests are answered with 503 and Retry-After instead of piling up.
+
+With preload (the default) the app is imported once in the master; add
+PRELOAD_MODELS=1 to load the models there too and share their weights with
+the workers copy-on-write. Background threads are started per worker in
+post_fork, and only one worker runs the bill sync.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '5000')}")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+# gthread serves APP:app; for the async handlers in asgi.py run
+#   gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi:app
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+
+# A worker that stops heartbeating this long is restarted; requests that
+# wait on inference give up sooner (INFERENCE_TIMEOUT_SECONDS)
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+if preload_app:
+    # Threads do not survive fork, so the master must not start them
+    os.environ["DEFER_BACKGROUND_WORKERS"] = "1"
+
+
+def post_fork(server, worker):
+    import models
+
+    # Split the cores between workers instead of every worker using all of them
+    default_threads = max(1, multiprocessing.cpu_count() // workers)
+    models.set_torch_threads(int(os.getenv("TORCH_THREADS", str(default_threads))))
+
+    if preload_app:
+        import APP
+        APP.start_background_workers()
@@ -0,0 +1,269 @@
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from observability import (
+    INFERENCE_BATCH_SIZE, INFERENCE_REJECTED, INFERENCE_SECONDS, MODEL_COLD_START_SECONDS, MODEL_LOAD_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+# Models are loaded lazily: nothing heavy is imported until first use, so the
+# app can answer /health immediately while warm_models_in_background() loads
+# them. To share weights between gunicorn workers via copy-on-write, set
+# PRELOAD_MODELS=1 and run gunicorn with preload (see gunicorn.conf.py) so
+# the master loads them before forking.
+
+SEMANTIC_MODEL_NAME = "all-MiniLM-L6-v2"
+SUMMARIZER_MODEL_NAME = "facebook/bart-large-cnn"
+
+# Inference backends: "torch" (full precision), "quantized" (dynamic int8
+# Linear layers) or "onnx" (ONNX Runtime). INFERENCE_BACKEND sets both models;
+# EMBEDDING_BACKEND / SUMMARIZER_BACKEND override one. Use parity_check.py to
+# measure accuracy drift and throughput before switching.
+BACKENDS = ("torch", "quantized", "onnx")
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", os.getenv("INFERENCE_BACKEND", "torch"))
+SUMMARIZER_BACKEND = os.getenv("SUMMARIZER_BACKEND", os.getenv("INFERENCE_BACKEND", "torch"))
+
+# Exporting BART to ONNX takes minutes, so it is done once into this
+# directory and every later load (cold starts, other workers) reads it
+ONNX_EXPORT_DIR = os.getenv("ONNX_EXPORT_DIR", "onnx-models")
+
+_process_start = time.monotonic()
+_lock = threading.Lock()
+_models = {}
+_state = {
+    # cold -> loading -> partial (some models loaded) -> ready (all loaded);
+    # error if the last load failed. Updated by every load, lazy or warmup.
+    "status": "cold",
+    "load_seconds": {},
+    "cold_start_seconds": None,
+    "error": None
+}
+
+
+def _quantize_dynamic(model):
+    """Swap Linear layers for dynamically quantized int8 versions (CPU only)"""
+    import torch
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def load_semantic_model(backend="torch"):
+    """Build the sentence embedding model on the given inference backend"""
+    from sentence_transformers import SentenceTransformer
+    if backend == "torch":
+        return SentenceTransformer(SEMANTIC_MODEL_NAME)
+    if backend == "quantized":
+        return _quantize_dynamic(SentenceTransformer(SEMANTIC_MODEL_NAME, device="cpu"))
+    if backend == "onnx":
+        return SentenceTransformer(SEMANTIC_MODEL_NAME, backend="onnx")
+    raise ValueError(f"Unknown inference backend: {backend}")
+
+
+def load_summarizer(backend="torch"):
+    """Build the summarization pipeline on the given inference backend"""
+    from transformers import AutoTokenizer, pipeline
+    if backend == "torch":
+        return pipeline("summarization", model=SUMMARIZER_MODEL_NAME, device=-1)
+
+    tokenizer = AutoTokenizer.from_pretrained(SUMMARIZER_MODEL_NAME)
+    if backend == "quantized":
+        from transformers import AutoModelForSeq2SeqLM
+        model = _quantize_dynamic(AutoModelForSeq2SeqLM.from_pretrained(SUMMARIZER_MODEL_NAME))
+    elif backend == "onnx":
+        model = _load_onnx_seq2seq(SUMMARIZER_MODEL_NAME)
+    else:
+        raise ValueError(f"Unknown inference backend: {backend}")
+    return pipeline("summarization", model=model, tokenizer=tokenizer, device=-1)
+
+
+def _load_onnx_seq2seq(model_name):
+    """ORT seq2seq model from ONNX_EXPORT_DIR, exporting it there on first use"""
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    path = os.path.join(ONNX_EXPORT_DIR, model_name.replace("/", "--"))
+    if os.path.isdir(path):
+        return ORTModelForSeq2SeqLM.from_pretrained(path)
+
+    logger.info("Exporting model to ONNX", extra={"model": model_name, "path": path})
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True)
+    # Save to a scratch directory and rename it into place, so a worker exporting
+    # at the same time never sees a partial export
+    os.makedirs(ONNX_EXPORT_DIR, exist_ok=True)
+    scratch = tempfile.mkdtemp(dir=ONNX_EXPORT_DIR, prefix=".export-")
+    try:
+        model.save_pretrained(scratch)
+        os.rename(scratch, path)
+    except OSError as e:
+        logger.warning("Could not save ONNX export", extra={"path": path, "error": str(e)})
+        shutil.rmtree(scratch, ignore_errors=True)
+    return model
+
+
+_loaders = {
+    "semantic_model": lambda: load_semantic_model(EMBEDDING_BACKEND),
+    "summarizer": lambda: load_summarizer(SUMMARIZER_BACKEND)
+}
+
+
+def _get(name):
+    model = _models.get(name)
+    if model is not None:
+        return model
+    with _lock:
+        model = _models.get(name)
+        if model is None:
+            model = _load(name)
+        return model
+
+
+def _load(name):
+    """Load one model and update the readiness state. Caller holds _lock."""
+    logger.info("Loading model", extra={"model": name})
+    _state["status"] = "loading"
+    start = time.monotonic()
+    try:
+        model = _loaders[name]()
+    except Exception as e:
+        _state["status"] = "error"
+        _state["error"] = str(e)
+        raise
+    _state["load_seconds"][name] = round(time.monotonic() - start, 3)
+    MODEL_LOAD_SECONDS.set(_state["load_seconds"][name], model=name)
+    _models[name] = model
+    logger.info("Loaded model", extra={"model": name, "seconds": _state["load_seconds"][name]})
+
+    _state["error"] = None
+    if len(_models) < len(_loaders):
+        _state["status"] = "partial"
+        return model
+    _state["status"] = "ready"
+    if _state["cold_start_seconds"] is None:
+        _state["cold_start_seconds"] = round(time.monotonic() - _process_start, 3)
+        MODEL_COLD_START_SECONDS.set(_state["cold_start_seconds"])
+        logger.info("Models ready", extra={"cold_start_seconds": _state["cold_start_seconds"]})
+    return model
+
+
+def get_semantic_model():
+    """Sentence embedding model, loaded on first use"""
+    return _get("semantic_model")
+
+
+def get_summarizer():
+    """BART summarization pipeline, loaded on first use"""
+    return _get("summarizer")
+
+
+def encode(texts):
+    """Embed texts with the semantic model"""
+    model = get_semantic_model()
+    INFERENCE_BATCH_SIZE.observe(len(texts), model="semantic_model")
+    with INFERENCE_SECONDS.time(model="semantic_model"):
+        return model.encode(texts)
+
+
+def set_torch_threads(num_threads):
+    """Cap torch intra-op threads so several server workers don't oversubscribe the CPU"""
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(max(1, num_threads))
+
+
+class InferenceBusy(Exception):
+    """Raised when the inference pool is saturated or a call timed out"""
+
+
+class InferencePool:
+    """Bounded thread pool for CPU-bound model calls made on the request path.
+
+    At most max_workers calls run at once and at most max_pending more may
+    wait; beyond that run() raises InferenceBusy immediately so handlers can
+    answer 503 instead of piling up. The executor is created lazily per
+    process, so the pool is safe to build before a fork.
+    """
+
+    def __init__(self, max_workers, max_pending, timeout=None):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="inference"
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def run(self, fn, *args, **kwargs):
+        """Run fn on the pool and wait for its result (up to the pool timeout)"""
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            INFERENCE_REJECTED.inc()
+            raise InferenceBusy("Inference queue is full")
+        try:
+            future = self._get_executor().submit(fn, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise InferenceBusy(f"Inference did not finish within {self.timeout}s")
+
+
+# Request-path inference (query and interest embeddings) goes through this pool
+inference_pool = InferencePool(
+    max_workers=int(os.getenv("INFERENCE_THREADS", "2")),
+    max_pending=int(os.getenv("INFERENCE_QUEUE_SIZE", "16")),
+    timeout=float(os.getenv("INFERENCE_TIMEOUT_SECONDS", "30"))
+)
+
+
+def encode_interactive(texts):
+    """encode() on the bounded inference pool; raises InferenceBusy when saturated"""
+    return inference_pool.run(encode, texts)
+
+
+def load_all_models():
+    """Load every model synchronously; the last one to load records the cold-start time"""
+    try:
+        for name in _loaders:
+            _get(name)
+    except Exception:
+        logger.exception("Error loading models")
+        return False
+    return True
+
+
+def warm_models_in_background():
+    """Start loading every model on a daemon thread"""
+    thread = threading.Thread(target=load_all_models, name="model-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def readiness():
+    """Model loading state for /health"""
+    return {
+        "status": _state["status"],
+        "ready": _state["status"] == "ready",
+        "loaded": sorted(_models),
+        "backends": {"semantic_model": EMBEDDING_BACKEND, "summarizer": SUMMARIZER_BACKEND},
+        "load_seconds": dict(_state["load_seconds"]),
+        "cold_start_seconds": _state["cold_start_seconds"],
+        "error": _state["error"],
+        "inference_rejected": inference_pool.rejected
+    }
@@ -0,0 +1,130 @@
+"""Compare an inference backend against full-precision PyTorch.
+
+Reports embedding cosine drift and summary overlap (ROUGE-L F1) against the
+torch models, plus throughput for both, so a quantized or ONNX backend can
+be judged before setting INFERENCE_BACKEND.
+
+    python parity_check.py --backend quantized
+    python parity_check.py --backend onnx --skip-summaries
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+import db
+import models
+
+
+def load_bill_texts(limit):
+    """Embedding inputs for the mirrored bills, as the search path builds them"""
+    rows = db.query(
+        "SELECT title, description FROM bills ORDER BY update_date DESC LIMIT ?", (limit,)
+    )
+    return [f"{title} {description}" for title, description in rows]
+
+
+def long_documents(texts, words_per_doc=400):
+    """Join short bill texts into documents long enough to exercise the summarizer"""
+    documents, current = [], []
+    for text in texts:
+        current.extend(text.split())
+        if len(current) >= words_per_doc:
+            documents.append(" ".join(current))
+            current = []
+    return documents
+
+
+def rouge_l_f1(reference, candidate):
+    """ROUGE-L F1 over whitespace tokens"""
+    ref, cand = reference.lower().split(), candidate.lower().split()
+    if not ref or not cand:
+        return 0.0
+    previous = [0] * (len(cand) + 1)
+    for r in ref:
+        current = [0]
+        for j, c in enumerate(cand):
+            current.append(previous[j] + 1 if r == c else max(previous[j + 1], current[j]))
+        previous = current
+    lcs = previous[-1]
+    if lcs == 0:
+        return 0.0
+    precision, recall = lcs / len(cand), lcs / len(ref)
+    return 2 * precision * recall / (precision + recall)
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def check_embeddings(backend, texts):
+    reference_model = models.load_semantic_model("torch")
+    candidate_model = models.load_semantic_model(backend)
+
+    reference, reference_seconds = timed(reference_model.encode, texts)
+    candidate, candidate_seconds = timed(candidate_model.encode, texts)
+
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    cosines = np.sum(reference * candidate, axis=1)
+
+    # How often the nearest neighbour of each text stays the same
+    ref_nn = np.argsort(-(reference @ reference.T), axis=1)[:, 1]
+    cand_nn = np.argsort(-(candidate @ candidate.T), axis=1)[:, 1]
+
+    return {
+        "texts": len(texts),
+        "mean_cosine": float(cosines.mean()),
+        "min_cosine": float(cosines.min()),
+        "nearest_neighbour_agreement": float(np.mean(ref_nn == cand_nn)),
+        "torch_texts_per_second": len(texts) / reference_seconds,
+        "backend_texts_per_second": len(texts) / candidate_seconds
+    }
+
+
+def check_summaries(backend, documents):
+    reference_pipeline = models.load_summarizer("torch")
+    candidate_pipeline = models.load_summarizer(backend)
+    params = {"max_length": 200, "min_length": 80, "do_sample": False, "truncation": True}
+
+    reference, reference_seconds = timed(reference_pipeline, documents, **params)
+    candidate, candidate_seconds = timed(candidate_pipeline, documents, **params)
+
+    scores = [
+        rouge_l_f1(r["summary_text"], c["summary_text"])
+        for r, c in zip(reference, candidate)
+    ]
+    return {
+        "documents": len(documents),
+        "mean_rouge_l_f1": float(np.mean(scores)) if scores else None,
+        "min_rouge_l_f1": float(np.min(scores)) if scores else None,
+        "torch_docs_per_second": len(documents) / reference_seconds,
+        "backend_docs_per_second": len(documents) / candidate_seconds
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=[b for b in models.BACKENDS if b != "torch"], required=True)
+    parser.add_argument("--texts", type=int, default=500, help="number of bills to embed")
+    parser.add_argument("--documents", type=int, default=8, help="number of documents to summarize")
+    parser.add_argument("--skip-summaries", action="store_true")
+    args = parser.parse_args()
+
+    texts = load_bill_texts(args.texts)
+    if not texts:
+        raise SystemExit("No bills in bill_tracker.db; let the bill sync run first")
+
+    report = {"backend": args.backend, "embeddings": check_embeddings(args.backend, texts)}
+    if not args.skip_summaries:
+        documents = long_documents(texts)[:args.documents]
+        report["summaries"] = check_summaries(args.backend, documents)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Text parsing shared across modules: date normalization, action-stage classification and HTML stripping.
+
+Patterns are compiled once at import. Dates repeat heavily (a few thousand
+distinct days cover every action), so normalization is memoized.
+Both run per action when progression is backfilled for many bills.
+"""
+import html
+import re
+from datetime import datetime
+from functools import lru_cache
+
+UNKNOWN_DATE = "0000-00-00"  # sorts after every real date when sorting newest first
+_UNKNOWN_DATE_TEXT = {"N/A", "Recent", "Loading..."}
+
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_US_DATE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+_HTML_TAG = re.compile(r"<[^>]+>")
+
+# Checked in this order: an action mentioning several keywords gets the first one's stage
+STAGE_MAPPING = {
+    "introduced": 1,
+    "committee": 2,
+    "floor": 3,
+    "passed": 4,
+    "senate": 5,
+    "signed": 6,
+    "vetoed": 6
+}
+DEFAULT_STAGE = 1
+
+# (keyword, stage) pairs in priority order. Seven substring checks in C beat one
+# combined regex here: the regex needs a Python-level pass over every match.
+_STAGE_KEYWORDS = tuple(STAGE_MAPPING.items())
+
+
+@lru_cache(maxsize=8192)
+def normalize_date(date_str):
+    """YYYY-MM-DD for ISO, MM/DD/YYYY or "Month DD, YYYY" dates; UNKNOWN_DATE otherwise"""
+    if not isinstance(date_str, str) or not date_str or date_str in _UNKNOWN_DATE_TEXT:
+        return UNKNOWN_DATE
+
+    match = _ISO_DATE.match(date_str)
+    if match:
+        return match.group(0)
+
+    match = _US_DATE.match(date_str)
+    if match:
+        month, day, year = match.groups()
+        return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+
+    try:
+        return datetime.strptime(date_str, "%B %d, %Y").strftime("%Y-%m-%d")
+    except ValueError:
+        return UNKNOWN_DATE
+
+
+def classify_action_stage(action_text):
+    """Map lowercased action text to a legislative stage number (1-6)"""
+    for keyword, stage_num in _STAGE_KEYWORDS:
+        if keyword in action_text:
+            return stage_num
+    return DEFAULT_STAGE
+
+
+def classify_action_stages(action_texts):
+    """classify_action_stage over a batch of lowercased action texts"""
+    return [classify_action_stage(text) for text in action_texts]
+
+
+def html_to_text(markup):
+    """Plain text of an HTML fragment such as a CRS summary: tags dropped, entities decoded, whitespace collapsed"""
+    return " ".join(html.unescape(_HTML_TAG.sub(" ", markup or "")).split())
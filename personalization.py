@@ -0,0 +1,208 @@
+import json
+import sys
+import threading
+
+import numpy as np
+
+import db
+import search_index
+from embedding_store import normalize_rows
+from vector_index import top_k_rows
+
+LOCATION_BOOST = 0.2  # added to the score of bills that mention the user's location
+USER_CHUNK_SIZE = 1024  # users scored per matrix multiply in batch mode
+
+
+def parse_interests(interests):
+    """Comma-separated interests from user_profiles as a clean list"""
+    return [i.strip().lower() for i in (interests or "").split(",") if i.strip()]
+
+
+def parse_topic_weights(raw):
+    """feed_preferences.topic_weights JSON ({"topic": weight}) as a dict; bad JSON is ignored"""
+    try:
+        weights = json.loads(raw) if raw else {}
+    except ValueError:
+        return {}
+    if not isinstance(weights, dict):
+        return {}
+    parsed = {}
+    for topic, weight in weights.items():
+        try:
+            parsed[str(topic).strip().lower()] = float(weight)
+        except (TypeError, ValueError):
+            continue
+    return {topic: weight for topic, weight in parsed.items() if topic and weight}
+
+
+def load_profiles(user_ids=None, frequency=None):
+    """Profiles as dicts (user_id, location, interests, topic_weights).
+
+    Either for the given users, or for every user with a personalized feed
+    and the given notification_frequency.
+    """
+    sql = '''
+        SELECT p.user_id, p.location, p.interests, f.topic_weights
+        FROM user_profiles p
+        LEFT JOIN feed_preferences f ON f.user_id = p.user_id
+    '''
+    if user_ids is not None:
+        placeholders = ",".join("?" * len(user_ids))
+        rows = db.query(sql + f"WHERE p.user_id IN ({placeholders})", tuple(user_ids))
+    else:
+        rows = db.query(sql + '''
+            WHERE COALESCE(f.feed_type, 'personalized') = 'personalized'
+              AND COALESCE(f.notification_frequency, 'weekly') = ?
+        ''', (frequency or "weekly",))
+    return [{
+        "user_id": user_id,
+        "location": (location or "").strip(),
+        "interests": parse_interests(interests),
+        "topic_weights": parse_topic_weights(topic_weights)
+    } for user_id, location, interests, topic_weights in rows]
+
+
+class InterestEmbeddings:
+    """Per-user interest vectors, re-encoded only when a user's interests or topic weights change.
+
+    A user's vector is the normalized sum of the embedding of their interests
+    and each weighted topic embedding.
+    """
+
+    def __init__(self, encode):
+        self.encode = encode
+        self._users = {}  # user_id -> (profile key, vector)
+        self._texts = {}  # interest text or topic -> normalized vector
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(profile):
+        return (tuple(profile["interests"]), tuple(sorted(profile["topic_weights"].items())))
+
+    def matrix_for(self, profiles):
+        """Normalized (len(profiles), dim) matrix of interest vectors, row-aligned with profiles.
+
+        Profiles with neither interests nor topic weights get a zero row.
+        """
+        with self._lock:
+            stale = [p for p in profiles if self._users.get(p["user_id"], (None,))[0] != self._key(p)]
+
+            # Encode every text that is not cached yet in one call
+            missing = []
+            for profile in stale:
+                texts = list(profile["topic_weights"])
+                if profile["interests"]:
+                    texts.append(", ".join(profile["interests"]))
+                missing.extend(t for t in texts if t not in self._texts and t not in missing)
+            if missing:
+                self._texts.update(zip(missing, normalize_rows(self.encode(missing))))
+
+            for profile in stale:
+                vector = None
+                if profile["interests"]:
+                    vector = self._texts[", ".join(profile["interests"])].copy()
+                for topic, weight in profile["topic_weights"].items():
+                    weighted = weight * self._texts[topic]
+                    vector = weighted if vector is None else vector + weighted
+                self._users[profile["user_id"]] = (self._key(profile), vector)
+
+            vectors = [self._users[p["user_id"]][1] for p in profiles]
+
+        dim = next((v.shape[0] for v in vectors if v is not None), None)
+        if dim is None:
+            return None
+        return normalize_rows(np.vstack([
+            v if v is not None else np.zeros(dim, dtype=np.float32) for v in vectors
+        ]))
+
+
+def location_boosts(profiles, bill_numbers):
+    """(len(profiles), len(bill_numbers)) matrix of LOCATION_BOOST where a bill mentions the user's location"""
+    columns = {bill_number: i for i, bill_number in enumerate(bill_numbers)}
+    locations = sorted({p["location"] for p in profiles if p["location"]})
+
+    # One full-text lookup per distinct location rather than per user
+    masks = np.zeros((len(locations) + 1, len(bill_numbers)), dtype=np.float32)
+    for row, location in enumerate(locations, start=1):
+        hits = [columns[n] for n in search_index.phrase_matches(location) if n in columns]
+        masks[row, hits] = LOCATION_BOOST
+
+    location_rows = {location: row for row, location in enumerate(locations, start=1)}
+    return masks[[location_rows.get(p["location"], 0) for p in profiles]]
+
+
+def rank_feeds(profiles, bill_numbers, bill_matrix, interest_embeddings, top_k=10):
+    """Top-k bills for every profile in one matrix multiply per chunk of users.
+
+    bill_matrix must be the normalized embedding matrix row-aligned with
+    bill_numbers. Returns {user_id: [(bill row, score), ...]} best first;
+    users without interests or topic weights get an empty feed.
+    """
+    feeds = {}
+    for start in range(0, len(profiles), USER_CHUNK_SIZE):
+        chunk = profiles[start:start + USER_CHUNK_SIZE]
+        user_matrix = interest_embeddings.matrix_for(chunk)
+        if user_matrix is None:
+            feeds.update((p["user_id"], []) for p in chunk)
+            continue
+
+        scores = user_matrix @ bill_matrix.T
+        scores += location_boosts(chunk, bill_numbers)
+        best = top_k_rows(scores, top_k)
+        best_scores = np.take_along_axis(scores, best, axis=1)
+
+        for i, profile in enumerate(chunk):
+            if not user_matrix[i].any():
+                feeds[profile["user_id"]] = []
+                continue
+            feeds[profile["user_id"]] = list(zip(best[i].tolist(), best_scores[i].tolist()))
+    return feeds
+
+
+def precompute_digests(bill_numbers, bill_matrix, interest_embeddings, frequency="weekly", top_k=10):
+    """Rank feeds for every user on the given notification frequency and store them in feed_digests.
+
+    Returns the number of users whose digest was written.
+    """
+    profiles = load_profiles(frequency=frequency)
+    feeds = rank_feeds(profiles, bill_numbers, bill_matrix, interest_embeddings, top_k)
+
+    rows = [
+        (user_id, rank, bill_numbers[column], score)
+        for user_id, feed in feeds.items()
+        for rank, (column, score) in enumerate(feed, start=1)
+    ]
+    with db.transaction() as conn:
+        for start in range(0, len(profiles), 500):
+            user_ids = [p["user_id"] for p in profiles[start:start + 500]]
+            conn.execute(
+                f"DELETE FROM feed_digests WHERE user_id IN ({','.join('?' * len(user_ids))})",
+                user_ids
+            )
+        conn.executemany('''
+            INSERT INTO feed_digests (user_id, rank, bill_number, score)
+            VALUES (?, ?, ?, ?)
+        ''', rows)
+    return sum(1 for feed in feeds.values() if feed)
+
+
+if __name__ == "__main__":
+    # Precompute digests for all users on a notification frequency (start the
+    # app once first so the schema exists): python personalization.py [weekly] [top_k]
+    import models
+    from bill_sync import load_catalog
+    from embedding_store import BillEmbeddingStore
+
+    frequency = sys.argv[1] if len(sys.argv) > 1 else "weekly"
+    top_k = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    catalog = load_catalog()
+    if not len(catalog):
+        sys.exit("No bills in bill_tracker.db; let the bill sync run first")
+
+    bill_matrix = BillEmbeddingStore(models.encode).matrix_for(catalog)
+    written = precompute_digests(
+        catalog.numbers, bill_matrix,
+        InterestEmbeddings(models.encode), frequency=frequency, top_k=top_k
+    )
+    print(f"Precomputed {frequency} digests for {written} users")
@@ -0,0 +1,272 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import db
+from congress_client import api_get, async_api_get, fetch_concurrently
+from parsing import classify_action_stages
+
+logger = logging.getLogger(__name__)
+
+# Bills that are not in the local mirror have no known updateDate; their stored
+# progression is trusted for this long after the last check
+PROGRESSION_MAX_AGE_SECONDS = int(os.getenv("PROGRESSION_MAX_AGE_SECONDS", "21600"))
+
+ACTIONS_PAGE_SIZE = 250  # Congress.gov maximum
+NEW_ACTIONS_PAGE_SIZE = 20  # first page size when only a few new actions are expected
+
+# The scheduled refresh gets its own few threads instead of the shared
+# congress_client pool, so a large backlog after a sync never queues ahead
+# of request-path detail lookups
+REFRESH_CONCURRENCY = int(os.getenv("PROGRESSION_REFRESH_CONCURRENCY", "2"))
+_refresh_executor = ThreadPoolExecutor(max_workers=REFRESH_CONCURRENCY, thread_name_prefix="progression-refresh")
+
+
+def get_stored_progression(bill_number):
+    """Stored progression rows for a bill, oldest first"""
+    rows = db.query('''
+        SELECT date, status, stage, description
+        FROM bill_progression
+        WHERE bill_number = ?
+        ORDER BY date
+    ''', (bill_number,))
+    return [{
+        "date": date,
+        "status": status,
+        "stage": stage,
+        "description": description
+    } for date, status, stage, description in rows]
+
+
+def get_stored_progressions(bill_numbers):
+    """get_stored_progression for several bills in one query: {bill_number: rows oldest first}"""
+    progressions = {bill_number: [] for bill_number in bill_numbers}
+    if not progressions:
+        return progressions
+    rows = db.query(f'''
+        SELECT bill_number, date, status, stage, description
+        FROM bill_progression
+        WHERE bill_number IN ({",".join("?" * len(progressions))})
+        ORDER BY date
+    ''', tuple(progressions))
+    for bill_number, date, status, stage, description in rows:
+        progressions[bill_number].append({
+            "date": date,
+            "status": status,
+            "stage": stage,
+            "description": description
+        })
+    return progressions
+
+
+def current_progressions(bill_numbers):
+    """The subset of bill_numbers whose stored progression reflects the latest upstream update.
+
+    Mirrored bills compare the updateDate seen at the last refresh with the
+    mirror's; other bills fall back to the age of the last check.
+    """
+    bill_numbers = list(dict.fromkeys(bill_numbers))
+    if not bill_numbers:
+        return set()
+    rows = db.query(f'''
+        SELECT t.bill_number, t.update_date, b.update_date,
+               t.last_checked >= datetime('now', ?)
+        FROM tracked_bills t
+        LEFT JOIN bills b ON b.bill_number = t.bill_number
+        WHERE t.bill_number IN ({",".join("?" * len(bill_numbers))})
+    ''', (f"-{PROGRESSION_MAX_AGE_SECONDS} seconds", *bill_numbers))
+    return {
+        bill_number for bill_number, tracked_update, mirror_update, recently_checked in rows
+        if (mirror_update == tracked_update if mirror_update else recently_checked)
+    }
+
+
+def is_progression_current(bill_number):
+    """True if the stored progression reflects the bill's latest upstream update"""
+    return bill_number in current_progressions([bill_number])
+
+
+class _NewActionsPager:
+    """Pagination for fetching the actions added since known_count were stored.
+
+    Congress.gov lists actions newest first and reports the total in
+    pagination.count, so the first (total - known_count) entries are the new
+    ones. Shared by the sync and async fetchers, which only do the requests.
+    """
+
+    def __init__(self, bill_number, known_count):
+        self.path = f"/bill/118/hr/{bill_number}/actions"
+        self.params = {"limit": NEW_ACTIONS_PAGE_SIZE if known_count else ACTIONS_PAGE_SIZE, "offset": 0}
+        self.known_count = known_count
+        self.actions = []
+        self.total = None
+
+    def add_page(self, payload):
+        """Consume one response; returns (new_actions, total) once done, otherwise None and advances params"""
+        page = payload.get("actions", [])
+        if self.total is None:
+            self.total = payload.get("pagination", {}).get("count", len(page))
+        self.actions.extend(page)
+
+        wanted = self.total - self.known_count
+        if not page or len(self.actions) >= wanted:
+            return self.actions[:max(wanted, 0)], self.total
+        self.params = {"limit": ACTIONS_PAGE_SIZE, "offset": self.params["offset"] + len(page)}
+        return None
+
+
+def _fetch_new_actions(bill_number, known_count):
+    """Fetch actions added since known_count were stored. Returns (new_actions, total_count)."""
+    pager = _NewActionsPager(bill_number, known_count)
+    while True:
+        r = api_get(pager.path, pager.params)
+        r.raise_for_status()
+        result = pager.add_page(r.json())
+        if result is not None:
+            return result
+
+
+async def _fetch_new_actions_async(bill_number, known_count):
+    """_fetch_new_actions over the async client"""
+    pager = _NewActionsPager(bill_number, known_count)
+    while True:
+        r = await async_api_get(pager.path, pager.params)
+        r.raise_for_status()
+        result = pager.add_page(r.json())
+        if result is not None:
+            return result
+
+
+def _tracking_state(bill_number):
+    """(stored action count or None, mirror updateDate or None) for a bill"""
+    rows = db.query('''
+        SELECT t.action_count, b.update_date
+        FROM (SELECT ? AS bill_number) q
+        LEFT JOIN tracked_bills t ON t.bill_number = q.bill_number
+        LEFT JOIN bills b ON b.bill_number = q.bill_number
+    ''', (bill_number,))
+    return rows[0]
+
+
+def refresh_bill_progression(bill_number):
+    """Store any actions added since the last refresh. Returns how many were new."""
+    known_count, mirror_update = _tracking_state(bill_number)
+    new_actions, total = _fetch_new_actions(bill_number, known_count or 0)
+    return _store_new_actions(bill_number, mirror_update, new_actions, total)
+
+
+async def refresh_bill_progression_async(bill_number):
+    """refresh_bill_progression that awaits Congress.gov; the database write runs on a thread"""
+    known_count, mirror_update = await asyncio.to_thread(_tracking_state, bill_number)
+    new_actions, total = await _fetch_new_actions_async(bill_number, known_count or 0)
+    return await asyncio.to_thread(_store_new_actions, bill_number, mirror_update, new_actions, total)
+
+
+def _store_new_actions(bill_number, mirror_update, new_actions, total):
+    texts = [action.get("text", "") for action in new_actions]
+    descriptions = [text.lower() for text in texts]
+    progression_rows = [
+        (bill_number, text, action.get("actionDate", ""), description, stage)
+        for action, text, description, stage
+        in zip(new_actions, texts, descriptions, classify_action_stages(descriptions))
+    ]
+
+    with db.transaction() as conn:
+        conn.executemany('''
+            INSERT OR IGNORE INTO bill_progression
+            (bill_number, status, date, description, stage)
+            VALUES (?, ?, ?, ?, ?)
+        ''', progression_rows)
+        conn.execute('''
+            INSERT INTO tracked_bills (bill_number, update_date, action_count, last_checked)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(bill_number) DO UPDATE SET
+                update_date = excluded.update_date,
+                action_count = excluded.action_count,
+                last_checked = CURRENT_TIMESTAMP
+        ''', (bill_number, mirror_update, total))
+
+    return len(progression_rows)
+
+
+def _refresh_logged(bill_number):
+    """refresh_bill_progression that logs failures instead of raising; returns new actions (0 on error)"""
+    try:
+        return refresh_bill_progression(bill_number)
+    except Exception as e:
+        logger.warning("Error refreshing progression", extra={"bill_number": bill_number, "error": str(e)})
+        return 0
+
+
+async def _refresh_logged_async(bill_number):
+    try:
+        return await refresh_bill_progression_async(bill_number)
+    except Exception as e:
+        logger.warning("Error refreshing progression", extra={"bill_number": bill_number, "error": str(e)})
+        return 0
+
+
+def track_bill_progression(bill_number):
+    """Return a bill's progression, fetching only new actions when it has changed"""
+    if not is_progression_current(bill_number):
+        _refresh_logged(bill_number)
+    return get_stored_progression(bill_number)
+
+
+async def track_bill_progression_async(bill_number):
+    """track_bill_progression for async handlers; database reads run on a thread"""
+    if not await asyncio.to_thread(is_progression_current, bill_number):
+        await _refresh_logged_async(bill_number)
+    return await asyncio.to_thread(get_stored_progression, bill_number)
+
+
+def track_bill_progressions(bill_numbers):
+    """track_bill_progression for several bills: {bill_number: progression}.
+
+    Freshness and stored rows are each read in one query; only the bills
+    that changed upstream are refreshed, concurrently.
+    """
+    current = current_progressions(bill_numbers)
+    fetch_concurrently(_refresh_logged, [n for n in bill_numbers if n not in current])
+    return get_stored_progressions(bill_numbers)
+
+
+async def track_bill_progressions_async(bill_numbers):
+    """track_bill_progressions for async handlers; database reads run on a thread"""
+    current = await asyncio.to_thread(current_progressions, bill_numbers)
+    await asyncio.gather(*(_refresh_logged_async(n) for n in bill_numbers if n not in current))
+    return await asyncio.to_thread(get_stored_progressions, bill_numbers)
+
+
+def refresh_tracked_bills():
+    """Bring every tracked bill whose upstream updateDate moved up to date"""
+    rows = db.query('''
+        SELECT t.bill_number
+        FROM tracked_bills t
+        LEFT JOIN bills b ON b.bill_number = t.bill_number
+        WHERE (b.update_date IS NOT NULL AND b.update_date IS NOT t.update_date)
+           OR (b.update_date IS NULL AND t.last_checked < datetime('now', ?))
+    ''', (f"-{PROGRESSION_MAX_AGE_SECONDS} seconds",))
+    stale = [row[0] for row in rows]
+    new_actions = sum(_refresh_executor.map(_refresh_logged, stale))
+    return len(stale), new_actions
+
+
+def start_progression_refresher(interval_seconds=900):
+    """Run refresh_tracked_bills on a daemon thread every interval_seconds"""
+    def run():
+        while True:
+            time.sleep(interval_seconds)
+            try:
+                refreshed, new_actions = refresh_tracked_bills()
+                if refreshed:
+                    logger.info("Progression refresh", extra={"bills": refreshed, "new_actions": new_actions})
+            except Exception:
+                logger.exception("Error refreshing tracked bills")
+
+    thread = threading.Thread(target=run, name="progression-refresh", daemon=True)
+    thread.start()
+    return thread
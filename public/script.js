@@ -8,6 +8,7 @@ let userSettings = JSON.parse(localStorage.getItem('userSettings') || '{"ageGrou
 let currentQuery = '';
 let currentPage = 1;
 let hasMoreBills = false;
+let nextCursor = null;
 let isLoading = false;
 let allLoadedBills = [];
 let modelsReady = false;
@@ -233,6 +234,8 @@ function displaySavedBills() {
   const header = `<div class="results-header"><h2><i class="fas fa-bookmark"></i> Your Saved Bills (${savedBills.length})</h2><p>Bills you've bookmarked for later reference</p></div>`;
   const billsHTML = savedBills.map((bill, index) => createBillCardHTML(bill, index, true)).join('');
   billsContainer.innerHTML = header + `<div class="bills-grid">${billsHTML}</div>`;
+  // The server caps a batch at 50 bills
+  loadBillDetails(savedBills.slice(0, 50)).then(changed => { if (changed) localStorage.setItem('savedBills', JSON.stringify(savedBills)); });
 }
 
 // ------------------ NOTIFICATIONS ------------------
@@ -291,7 +294,7 @@ async function searchBills(loadMore = false) {
 
   if (!loadMore) {
     errorContainer && (errorContainer.innerHTML = '');
-    currentPage = 1; allLoadedBills = []; currentQuery = query;
+    currentPage = 1; allLoadedBills = []; currentQuery = query; nextCursor = null; timelineCache.clear();
   }
 
   if (!query) {
@@ -305,42 +308,59 @@ async function searchBills(loadMore = false) {
   if (!loadMore) { searchBtn && (searchBtn.disabled = true); if (billsContainer) billsContainer.innerHTML = '<div class="loading"><div class="spinner"></div><div>🚀 AI is quickly finding the most relevant bills...</div></div>'; }
   else { const loadMoreBtn = document.getElementById('loadMoreBtn'); if (loadMoreBtn) { loadMoreBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Loading more...'; loadMoreBtn.disabled = true; } }
 
+  let restart = false;
   try {
     const response = await fetch(`${BACKEND_URL}/search_bills`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ query, page: currentPage, per_page: 5 })
+      body: JSON.stringify({ query, page: currentPage, per_page: 5, cursor: loadMore ? nextCursor : undefined, stream: true })
     });
 
+    // The cursor's ranking has expired on the server; start the search over from page 1
+    if (loadMore && response.status === 410) {
+      restart = true;
+      showNotification('Search results expired, refreshing...', 'info');
+      return;
+    }
+
     if (!response.ok) {
       const errorData = await response.json().catch(() => ({}));
       throw new Error(errorData.error || `API error: ${response.status}`);
     }
 
-    const data = await response.json();
-    if (!data.bills || data.bills.length === 0) {
-      if (!loadMore) throw new Error('No relevant bills found. Try a different search term or broader keywords.');
-      return;
-    }
+    // Ranked bills arrive first; sponsor, status and date follow per bill as the server fetches them
+    const previousBills = loadMore ? allLoadedBills : [];
+    let pageBills = [];
+    let totalFound = null;
+    await readSearchStream(response, event => {
+      if (event.type === 'results') {
+        if (!event.bills || event.bills.length === 0) {
+          if (!loadMore) throw new Error('No relevant bills found. Try a different search term or broader keywords.');
+          return;
+        }
+        pageBills = event.bills.map(toBillCard);
+        totalFound = event.total_found;
+        allLoadedBills = [...previousBills, ...pageBills];
+        hasMoreBills = !!event.has_more;
+        nextCursor = event.next_cursor || null;
+        currentPage++;
+        displayBills(allLoadedBills, query, totalFound, false);
+        updateNavStats(allLoadedBills.length, totalFound);
+      } else if (event.type === 'details') {
+        const bill = pageBills.find(b => b.number === `H.R. ${event.number}`);
+        if (bill) { Object.assign(bill, { sponsor: event.sponsor || 'N/A', status: event.status || 'N/A', date: event.date || 'N/A', dateObj: parseDate(event.date) }); updateBillCardDetails(bill); }
+      } else if (event.type === 'error') {
+        throw new Error(event.error || 'Search failed');
+      }
+    });
 
-    const bills = data.bills.map(bill => ({
-      number: bill.number ? `H.R. ${bill.number}` : 'Unknown',
-      title: bill.title || 'No title',
-      sponsor: bill.sponsor || 'N/A',
-      status: bill.status || 'N/A',
-      date: bill.date || 'N/A',
-      summary: bill.summary || '',
-      relevance: bill.relevance_score || 0,
-      url: bill.url || '',
-      dateObj: parseDate(bill.date)
-    }));
-
-    allLoadedBills = loadMore ? [...allLoadedBills, ...bills] : bills;
-    hasMoreBills = !!data.has_more;
-    currentPage++;
-
-    displayBills(allLoadedBills, query, data.total_found);
-    updateNavStats(allLoadedBills.length, data.total_found);
+    // Same order as a buffered response: each page newest first once its dates are known
+    if (pageBills.length) {
+      pageBills.sort((a, b) => b.dateObj - a.dateObj);
+      allLoadedBills = [...previousBills, ...pageBills];
+      displayBills(allLoadedBills, query, totalFound);
+      prefetchTimelines(pageBills);
+    }
   } catch (error) {
     console.error('Search error:', error);
     if (!loadMore) {
@@ -354,12 +374,54 @@ async function searchBills(loadMore = false) {
     if (!loadMore) { searchBtn && (searchBtn.disabled = false); if (searchBtn) searchBtn.innerHTML = '<i class="fas fa-search"></i><span>Search</span>'; }
     else { const loadMoreBtn = document.getElementById('loadMoreBtn'); if (loadMoreBtn) { loadMoreBtn.innerHTML = '<i class="fas fa-plus"></i> Load More Bills'; loadMoreBtn.disabled = false; } }
   }
+  if (restart) searchBills();
+}
+
+function toBillCard(bill) {
+  return {
+    number: bill.number ? `H.R. ${bill.number}` : 'Unknown',
+    title: bill.title || 'No title',
+    sponsor: bill.sponsor || 'N/A',
+    status: bill.status || 'N/A',
+    date: bill.date || 'N/A',
+    summary: bill.summary || '',
+    relevance: bill.relevance_score || 0,
+    url: bill.url || '',
+    dateObj: parseDate(bill.date)
+  };
+}
+
+// Calls onEvent for each line of an NDJSON response (or once for a plain JSON one)
+async function readSearchStream(response, onEvent) {
+  if (!(response.headers.get('Content-Type') || '').includes('application/x-ndjson') || !response.body) {
+    onEvent({ type: 'results', ...(await response.json()) });
+    return;
+  }
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = '';
+  while (true) {
+    const { done, value } = await reader.read();
+    buffered += decoder.decode(value || new Uint8Array(), { stream: !done });
+    const lines = buffered.split('\n');
+    buffered = lines.pop();
+    for (const line of lines) if (line.trim()) onEvent(JSON.parse(line));
+    if (done) break;
+  }
+  if (buffered.trim()) onEvent(JSON.parse(buffered));
+}
+
+function updateBillCardDetails(bill) {
+  const number = CSS.escape(bill.number);
+  document.querySelectorAll(`.bill-status[data-bill="${number}"]`).forEach(el => { el.textContent = bill.status; });
+  document.querySelectorAll(`.bill-sponsor[data-bill="${number}"]`).forEach(el => { el.textContent = bill.sponsor; });
+  document.querySelectorAll(`.bill-date[data-bill="${number}"]`).forEach(el => { el.textContent = bill.date; });
 }
 
 function loadMoreBills() { if (hasMoreBills && !isLoading) searchBills(true); }
 function searchCategory(category) { const input = document.getElementById('searchInput'); if (input) input.value = category; searchBills(); }
 
-function displayBills(bills, query, totalFound = null) {
+function displayBills(bills, query, totalFound = null, autoSave = true) {
   const billsContainer = document.getElementById('billsContainer');
   if (!billsContainer) return;
   const showingText = totalFound && totalFound > bills.length ? `Showing ${bills.length} of ${totalFound} bills` : `Found ${bills.length} bills`;
@@ -368,7 +430,7 @@ function displayBills(bills, query, totalFound = null) {
   const loadMoreButton = hasMoreBills ? `<div class="load-more-container"><button class="load-more-btn" id="loadMoreBtn" onclick="loadMoreBills()"><i class="fas fa-plus"></i> Load More Bills</button><p class="load-more-text">Loading 5 bills at a time for faster performance</p></div>` : '';
   billsContainer.innerHTML = resultsHeader + `<div class="bills-grid">${billsHTML}</div>` + loadMoreButton;
 
-  if (userSettings.autoSave) bills.forEach(b => { if (b.relevance > 0.7) saveBill(b); });
+  if (autoSave && userSettings.autoSave) bills.forEach(b => { if (b.relevance > 0.7) saveBill(b); });
 }
 
 function createBillCardHTML(bill, index, isSavedView = false) {
@@ -412,26 +474,29 @@ function createBillCardHTML(bill, index, isSavedView = false) {
     </div>`;
 }
 
-async function loadBillDetails(billNumber) {
+function apiBillNumber(billNumber) { return (billNumber || '').replace('H.R. ', ''); }
+
+// Refreshes sponsor, status and date for several bills in one request; resolves true if any changed
+async function loadBillDetails(bills) {
+  if (!bills.length) return false;
   try {
-    const response = await fetch(`${BACKEND_URL}/get_bill_details`, {
+    const response = await fetch(`${BACKEND_URL}/bill_details`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ bill_number: (billNumber || '').replace('H.R. ', '') })
+      body: JSON.stringify({ bill_numbers: bills.map(b => apiBillNumber(b.number)) })
     });
-    if (!response.ok) return;
-    const data = await response.json();
-    const details = data.details || {};
-    const billCard = document.querySelector(`[data-bill="${billNumber}"]`);
-    if (billCard) {
-      const statusEl = billCard.querySelector('.bill-status');
-      const sponsorEl = billCard.querySelector('.bill-sponsor');
-      const dateEl = billCard.querySelector('.bill-date');
-      if (statusEl && details.status) statusEl.textContent = details.status;
-      if (sponsorEl && details.sponsor) sponsorEl.textContent = details.sponsor;
-      if (dateEl && details.date) dateEl.textContent = details.date;
-    }
-  } catch (error) { console.error('Error loading bill details:', error); }
+    if (!response.ok) return false;
+    const details = (await response.json()).details || {};
+    let changed = false;
+    bills.forEach(bill => {
+      const d = details[apiBillNumber(bill.number)];
+      if (!d || d.status === 'N/A') return;
+      Object.assign(bill, { sponsor: d.sponsor, status: d.status, date: d.date, dateObj: parseDate(d.date) });
+      updateBillCardDetails(bill);
+      changed = true;
+    });
+    return changed;
+  } catch (error) { console.error('Error loading bill details:', error); return false; }
 }
 
 function handleChatKeypress(event) { if (event.key === 'Enter') sendChatMessage(); }
@@ -466,12 +531,32 @@ function updateNavStats(billCount, totalFound = null) {
 // ------------------ ENHANCED FEATURES ------------------
 
 // Bill Timeline
+const timelineCache = new Map(); // API bill number -> /bill_progression-shaped response
+
+// One request for the timelines of a whole page, so opening any of them is instant
+async function prefetchTimelines(bills) {
+  const numbers = bills.map(b => apiBillNumber(b.number)).filter(n => n && !timelineCache.has(n));
+  if (!numbers.length) return;
+  try {
+    const response = await fetch(`${BACKEND_URL}/bill_progressions`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ bill_numbers: numbers })
+    });
+    if (!response.ok) return;
+    const progressions = (await response.json()).progressions || {};
+    Object.entries(progressions).forEach(([number, entry]) => timelineCache.set(number, { bill_number: number, ...entry }));
+  } catch (error) { console.error('Error prefetching timelines:', error); }
+}
+
 async function showBillTimeline(billNumber) {
+  const cached = timelineCache.get(apiBillNumber(billNumber));
+  if (cached) { displayTimelineModal(cached); return; }
   try {
     const response = await fetch(`${BACKEND_URL}/bill_progression`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ bill_number: billNumber.replace('H.R. ', '') })
+      body: JSON.stringify({ bill_number: apiBillNumber(billNumber) })
     });
 
     if (!response.ok) throw new Error('Failed to get bill timeline');
@@ -558,11 +643,20 @@ async function showVotingHeatmap(billNumber) {
 
 function displayHeatmapModal(data) {
   const modal = createModal('heatmap-modal', 'Voting Patterns by State');
-  const votingData = data.voting_data;
+  const votingData = data.voting_data || {};
+
+  if (Object.keys(votingData).length === 0) {
+    modal.querySelector('.modal-body').innerHTML = `
+      <div class="heatmap-disclaimer">
+        <p><i class="fas fa-info-circle"></i> ${escapeHtml(data.message || 'No voting data available for this bill yet.')}</p>
+      </div>`;
+    document.body.appendChild(modal);
+    return;
+  }
 
   const content = `
       <div class="heatmap-disclaimer">
-        <p><i class="fas fa-info-circle"></i> This is sample data for demonstration. Real implementation would use actual congressional voting records.</p>
+        <p><i class="fas fa-info-circle"></i> Member votes from the bill's most recent House roll call, grouped by state.</p>
       </div>
     <div class="voting-heatmap">
       <div class="heatmap-header">
@@ -0,0 +1,336 @@
+import asyncio
+import functools
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import db
+import observability
+
+logger = logging.getLogger(__name__)
+
+# Shared by every cache for stale-while-revalidate refreshes
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+
+# Stale-while-revalidate refreshes scheduled from async callers (kept referenced until done)
+_refresh_tasks = set()
+
+_caches = {}
+
+
+def _call_key(args, kwargs):
+    return repr((args, sorted(kwargs.items())))
+
+
+class ResponseCache:
+    """Bounded LRU of upstream responses with TTLs and stale-while-revalidate.
+
+    Entries younger than ttl are fresh. Entries older than ttl but younger
+    than ttl + stale_ttl are served immediately while one background refresh
+    runs. Anything older is refetched inline. Concurrent misses for the same
+    key share a single upstream call. With persist=True entries are also
+    written through to the api_cache table so they survive restarts.
+    """
+
+    def __init__(self, name, ttl, stale_ttl=0, max_entries=1024, persist=False):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.persist = persist
+        self._entries = OrderedDict()  # key -> (value, fetched_at)
+        self._inflight = {}  # key -> Future
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _caches[name] = self
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_entries": self.max_entries
+            }
+
+    def _store(self, key, value, fetched_at):
+        """Insert into the LRU tier, evicting the least recently used entries. Caller holds the lock."""
+        self._entries[key] = (value, fetched_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _load_persistent(self, key):
+        try:
+            rows = db.query(
+                "SELECT value, fetched_at FROM api_cache WHERE cache_name = ? AND cache_key = ?",
+                (self.name, key)
+            )
+        except sqlite3.Error as e:
+            logger.warning("Error reading persistent cache", extra={"cache": self.name, "error": str(e)})
+            return None
+        if not rows:
+            return None
+        return json.loads(rows[0][0]), rows[0][1]
+
+    def preload_calls(self, calls, chunk_size=500):
+        """Pull persisted entries for several calls (argument tuples of the wrapped function) into memory.
+
+        One query per chunk instead of one per key, so a batch of lookups
+        that follows is served from the LRU tier.
+        """
+        if not self.persist:
+            return 0
+        keys = [_call_key(tuple(args), {}) for args in calls]
+        with self._lock:
+            missing = [key for key in keys if key not in self._entries]
+
+        loaded = 0
+        for i in range(0, len(missing), chunk_size):
+            chunk = missing[i:i + chunk_size]
+            try:
+                rows = db.query(f'''
+                    SELECT cache_key, value, fetched_at
+                    FROM api_cache
+                    WHERE cache_name = ? AND cache_key IN ({",".join("?" * len(chunk))})
+                ''', (self.name, *chunk))
+            except sqlite3.Error as e:
+                logger.warning("Error reading persistent cache", extra={"cache": self.name, "error": str(e)})
+                return loaded
+            with self._lock:
+                for key, value, fetched_at in rows:
+                    if key not in self._entries:
+                        self._store(key, json.loads(value), fetched_at)
+                        loaded += 1
+        return loaded
+
+    def _save_persistent(self, key, value, fetched_at):
+        try:
+            with db.transaction() as conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO api_cache (cache_name, cache_key, value, fetched_at)
+                    VALUES (?, ?, ?, ?)
+                ''', (self.name, key, json.dumps(value), fetched_at))
+        except sqlite3.Error as e:
+            logger.warning("Error writing persistent cache", extra={"cache": self.name, "error": str(e)})
+
+    def _claim(self, key):
+        """Return (future, owner); only the owner fetches, everyone else waits on the future"""
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+        return future, owner
+
+    def _fail(self, key, future, error):
+        with self._lock:
+            del self._inflight[key]
+        future.set_exception(error)
+
+    def _fetch(self, key, fetch, cache_if):
+        """Run fetch once per key at a time; other callers wait on the same result"""
+        future, owner = self._claim(key)
+        if not owner:
+            return future.result()
+
+        try:
+            value = fetch()
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        persist_at = self._complete(key, future, value, cache_if)
+        if persist_at is not None:
+            self._save_persistent(key, value, persist_at)
+        return value
+
+    async def _fetch_async(self, key, fetch, cache_if):
+        """_fetch for a coroutine function; shares in-flight fetches with sync callers"""
+        future, owner = self._claim(key)
+        if not owner:
+            return await asyncio.wrap_future(future)
+
+        try:
+            value = await fetch()
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        persist_at = self._complete(key, future, value, cache_if)
+        if persist_at is not None:
+            # SQLite write off the event loop
+            await asyncio.to_thread(self._save_persistent, key, value, persist_at)
+        return value
+
+    def _complete(self, key, future, value, cache_if):
+        """Cache value (unless vetoed) and release waiters.
+
+        Returns the fetched_at the caller should persist the entry with, or None.
+        """
+        fetched_at = time.time()
+        cacheable = cache_if is None or cache_if(value)
+        with self._lock:
+            if cacheable:
+                self._store(key, value, fetched_at)
+            del self._inflight[key]
+        future.set_result(value)
+        return fetched_at if cacheable and self.persist else None
+
+    def _refresh(self, key, fetch, cache_if):
+        try:
+            self._fetch(key, fetch, cache_if)
+        except Exception as e:
+            logger.warning("Error refreshing cache entry", extra={"cache": self.name, "key": key, "error": str(e)})
+
+    async def _refresh_async(self, key, fetch, cache_if):
+        try:
+            await self._fetch_async(key, fetch, cache_if)
+        except Exception as e:
+            logger.warning("Error refreshing cache entry", extra={"cache": self.name, "key": key, "error": str(e)})
+
+    def _lookup(self, key):
+        """Return (found, value, refresh): a usable entry, and whether a stale one needs refreshing"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is None and self.persist:
+            entry = self._load_persistent(key)
+            if entry is not None:
+                with self._lock:
+                    self._store(key, entry[0], entry[1])
+
+        if entry is not None:
+            value, fetched_at = entry
+            age = now - fetched_at
+            if age < self.ttl:
+                with self._lock:
+                    self.hits += 1
+                return True, value, False
+            if age < self.ttl + self.stale_ttl:
+                with self._lock:
+                    self.stale_hits += 1
+                    refreshing = key in self._inflight
+                return True, value, not refreshing
+
+        with self._lock:
+            self.misses += 1
+        return False, None, False
+
+    def put(self, key, value):
+        """Cache a value produced elsewhere, as if it had just been fetched (memory tier only)"""
+        with self._lock:
+            self._store(key, value, time.time())
+
+    def get_or_fetch(self, key, fetch, cache_if=None):
+        """Return the cached value for key, calling fetch() when it is missing or expired.
+
+        cache_if(value) can veto caching, e.g. for error placeholders.
+        """
+        found, value, refresh = self._lookup(key)
+        if refresh:
+            _refresh_executor.submit(self._refresh, key, fetch, cache_if)
+        if found:
+            return value
+        return self._fetch(key, fetch, cache_if)
+
+    async def get_or_fetch_async(self, key, fetch, cache_if=None):
+        """get_or_fetch for a coroutine function fetch; stale entries refresh as a task on the running loop"""
+        if self.persist:
+            # A memory miss reads the api_cache table; keep SQLite off the event loop
+            found, value, refresh = await asyncio.to_thread(self._lookup, key)
+        else:
+            found, value, refresh = self._lookup(key)
+        if refresh:
+            task = asyncio.get_running_loop().create_task(self._refresh_async(key, fetch, cache_if))
+            _refresh_tasks.add(task)
+            task.add_done_callback(_refresh_tasks.discard)
+        if found:
+            return value
+        return await self._fetch_async(key, fetch, cache_if)
+
+    def wrap(self, fn, cache_if=None):
+        """Put this cache in front of fn (a plain or coroutine function), keyed by call arguments.
+
+        Wrapping a sync and an async variant of the same call shares entries.
+        """
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                return await self.get_or_fetch_async(
+                    _call_key(args, kwargs), lambda: fn(*args, **kwargs), cache_if=cache_if
+                )
+            async_wrapper.cache = self
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return self.get_or_fetch(_call_key(args, kwargs), lambda: fn(*args, **kwargs), cache_if=cache_if)
+
+        wrapper.cache = self
+        return wrapper
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def cached_response(name, ttl, stale_ttl=0, max_entries=1024, persist=False, cache_if=None):
+    """Decorator that puts a ResponseCache in front of a function.
+
+    The cache key is built from the call arguments, which must have stable reprs.
+    """
+    def decorator(fn):
+        cache = ResponseCache(name, ttl, stale_ttl=stale_ttl, max_entries=max_entries, persist=persist)
+        return cache.wrap(fn, cache_if=cache_if)
+    return decorator
+
+
+def cache_stats():
+    """Counters for every registered cache, keyed by cache name"""
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def _metrics_lines():
+    stats = cache_stats()
+    lines = [
+        "# HELP response_cache_requests_total Cache lookups by result",
+        "# TYPE response_cache_requests_total counter"
+    ]
+    for name, s in stats.items():
+        for result, count in (("hit", s["hits"]), ("stale", s["stale_hits"]), ("miss", s["misses"])):
+            lines.append(f'response_cache_requests_total{{cache="{name}",result="{result}"}} {count}')
+    lines += [
+        "# HELP response_cache_hit_ratio Share of lookups served from the cache (fresh or stale)",
+        "# TYPE response_cache_hit_ratio gauge"
+    ]
+    for name, s in stats.items():
+        lookups = s["hits"] + s["stale_hits"] + s["misses"]
+        ratio = (s["hits"] + s["stale_hits"]) / lookups if lookups else 0.0
+        lines.append(f'response_cache_hit_ratio{{cache="{name}"}} {ratio}')
+    lines += [
+        "# HELP response_cache_evictions_total Entries evicted by the LRU bound",
+        "# TYPE response_cache_evictions_total counter"
+    ]
+    lines += [f'response_cache_evictions_total{{cache="{name}"}} {s["evictions"]}' for name, s in stats.items()]
+    lines += [
+        "# HELP response_cache_entries Entries currently cached",
+        "# TYPE response_cache_entries gauge"
+    ]
+    lines += [f'response_cache_entries{{cache="{name}"}} {s["size"]}' for name, s in stats.items()]
+    return lines
+
+
+observability.register_collector(_metrics_lines)
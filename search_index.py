@@ -0,0 +1,60 @@
+import re
+
+import db
+
+# Common words that would match most bills and only add noise to BM25
+STOPWORDS = {
+    "a", "an", "and", "are", "act", "bill", "bills", "by", "for", "from", "in", "is",
+    "of", "on", "or", "the", "to", "with", "about", "that", "this", "what"
+}
+
+# BM25 column weights, in bills_fts column order: bill_number, title, latest_action, summary
+BM25_WEIGHTS = (10.0, 5.0, 1.0, 2.0)
+
+RRF_K = 60
+
+
+def fts_query(query):
+    """Turn free text into an FTS5 OR-query of quoted terms ("H.R. 815" -> "815")"""
+    terms = []
+    for token in re.findall(r"\w+", query.lower()):
+        if token in STOPWORDS or (len(token) == 1 and not token.isdigit()):
+            continue
+        if token not in terms:
+            terms.append(token)
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+def lexical_search(query, limit=200):
+    """Bill numbers ranked by BM25 over number, title, latest action and summary"""
+    match = fts_query(query)
+    if not match:
+        return []
+    rows = db.query(f'''
+        SELECT bill_number
+        FROM bills_fts
+        WHERE bills_fts MATCH ?
+        ORDER BY bm25(bills_fts, {", ".join(str(w) for w in BM25_WEIGHTS)})
+        LIMIT ?
+    ''', (match, limit))
+    return [row[0] for row in rows]
+
+
+def phrase_matches(phrase, limit=10000):
+    """Bill numbers whose indexed text contains phrase (e.g. a user's location)"""
+    terms = re.findall(r"\w+", phrase.lower())
+    if not terms:
+        return []
+    rows = db.query('''
+        SELECT bill_number FROM bills_fts WHERE bills_fts MATCH ? LIMIT ?
+    ''', (f'"{" ".join(terms)}"', limit))
+    return [row[0] for row in rows]
+
+
+def reciprocal_rank_fusion(*rankings, k=RRF_K):
+    """Fuse ranked id lists into [(id, score)], best first: score = sum of 1 / (k + rank)"""
+    scores = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,192 @@
+import itertools
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+import db
+
+logger = logging.getLogger(__name__)
+
+# Lower number = served first; request-path work jumps ahead of backfill
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+
+class SummaryService:
+    """Micro-batching summarization worker with a persistent summary cache.
+
+    Bill numbers submitted from any thread are queued; a single worker thread
+    takes up to max_batch_size of them (waiting at most max_wait_seconds after
+    the first arrives), looks up each bill's source text with fetch_source and
+    runs the texts whose version has no summary yet through summarize_batch
+    in one call. Results are stored in the bill_summaries table keyed by bill
+    number and source version, so each version is only summarized once.
+
+    fetch_source(bill_number) returns (version, text), or None while the bill
+    has no source text. summarize_batch returns None for a text too short to
+    condense, which is then stored as written (the source is already a
+    summary), and raises when the model fails, which fails the batch's
+    futures and stores nothing. A bill's source is checked at most once per
+    recheck_seconds unless the submit asks for a recheck.
+    """
+
+    def __init__(self, summarize_batch, fetch_source, max_batch_size=8, max_wait_seconds=0.05,
+                 recheck_seconds=21600):
+        self.summarize_batch = summarize_batch
+        self.fetch_source = fetch_source
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.recheck_seconds = recheck_seconds
+        self._queue = queue.PriorityQueue()
+        self._counter = itertools.count()  # FIFO order within a priority
+        self._pending = {}  # bill_number -> Future
+        self._summaries = {}  # bill_number -> (version, summary)
+        self._checked = {}  # bill_number -> monotonic time its source was last checked
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def start(self):
+        """Start the worker thread (again, in a forked child whose thread did not survive)"""
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="summarizer", daemon=True)
+                self._thread.start()
+        return self
+
+    def _load(self):
+        """Read stored summaries into memory once per process. Caller holds the lock."""
+        rows = db.query("SELECT bill_number, text_version, summary FROM bill_summaries")
+        for bill_number, version, summary in rows:
+            self._summaries[bill_number] = (version, summary)
+        self._loaded = True
+
+    def cached_summary(self, bill_number):
+        """Return the stored summary of the bill's latest known source version, or None"""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            entry = self._summaries.get(str(bill_number))
+        return entry[1] if entry else None
+
+    def submit(self, bill_number, priority=PRIORITY_INTERACTIVE, recheck=False):
+        """Queue the bill for summarization and return a Future for its summary (None without source text).
+
+        A bill whose source was checked within recheck_seconds resolves to
+        its current summary at once, unless recheck is set.
+        """
+        bill_number = str(bill_number)
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            future = self._pending.get(bill_number)
+            if future is not None:
+                return future
+
+            checked = self._checked.get(bill_number)
+            if not recheck and checked is not None and time.monotonic() - checked < self.recheck_seconds:
+                future = Future()
+                future.set_result(self._summaries.get(bill_number, (None, None))[1])
+                return future
+
+            future = Future()
+            self._pending[bill_number] = future
+
+        self._queue.put((priority, next(self._counter), bill_number))
+        return future
+
+    def summarize(self, bill_number, timeout=None):
+        """Blocking summary lookup: cached result or a batched model run"""
+        return self.submit(bill_number).result(timeout=timeout)
+
+    def presummarize(self, bill_numbers):
+        """Queue bills (e.g. ones whose upstream update moved) as background work, rechecking their source"""
+        queued = 0
+        for bill_number in bill_numbers:
+            self.submit(bill_number, priority=PRIORITY_BACKGROUND, recheck=True)
+            queued += 1
+        return queued
+
+    def _next_batch(self):
+        """Block for one item, then gather more until the batch is full or max wait passes"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_seconds
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _fail(self, bill_numbers, error):
+        with self._lock:
+            futures = [self._pending.pop(bill_number, None) for bill_number in bill_numbers]
+        for future in futures:
+            if future is not None:
+                future.set_exception(error)
+
+    def _sources(self, bill_numbers):
+        """{bill_number: (version, text) or None} for the bills whose source could be fetched"""
+        sources = {}
+        for bill_number in bill_numbers:
+            try:
+                sources[bill_number] = self.fetch_source(bill_number)
+            except Exception as e:
+                logger.warning("Error fetching summary source", extra={"bill_number": bill_number, "error": str(e)})
+                self._fail([bill_number], e)
+        return sources
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            sources = self._sources([item[2] for item in batch])
+
+            with self._lock:
+                stale = [
+                    (bill_number, source) for bill_number, source in sources.items()
+                    if source is not None and self._summaries.get(bill_number, (None,))[0] != source[0]
+                ]
+            rows = []
+            if stale:
+                try:
+                    summaries = self.summarize_batch([text for _, (_, text) in stale])
+                except Exception as e:
+                    logger.error("Summarization batch error", extra={"batch_size": len(stale), "error": str(e)})
+                    self._fail([bill_number for bill_number, _ in stale], e)
+                    for bill_number, _ in stale:
+                        del sources[bill_number]
+                    summaries = []
+                rows = [
+                    (bill_number, version, text if summary is None else summary)
+                    for (bill_number, (version, text)), summary in zip(stale, summaries)
+                ]
+
+            try:
+                db.execute_many('''
+                    INSERT OR REPLACE INTO bill_summaries (bill_number, text_version, summary)
+                    VALUES (?, ?, ?)
+                ''', rows)
+            except sqlite3.Error as e:
+                logger.error("Error saving summaries", extra={"error": str(e)})
+
+            checked_at = time.monotonic()
+            with self._lock:
+                for bill_number, version, summary in rows:
+                    self._summaries[bill_number] = (version, summary)
+                futures = []
+                for bill_number in sources:
+                    self._checked[bill_number] = checked_at
+                    summary = self._summaries.get(bill_number, (None, None))[1]
+                    futures.append((self._pending.pop(bill_number, None), summary))
+            for future, summary in futures:
+                if future is not None:
+                    future.set_result(summary)
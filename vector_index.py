@@ -0,0 +1,271 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+
+def top_k_indices(scores, k):
+    """Indices of the k largest scores, best first, without a full sort"""
+    if k <= 0 or scores.shape[0] == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.shape[0]:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.shape[0])
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def top_k_rows(scores, k):
+    """Row-wise top_k_indices for a 2-D score matrix: (rows, k) column indices, best first"""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    if k < scores.shape[1]:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+class ExactIndex:
+    """Brute-force inner-product index over normalized vectors.
+
+    Vectors live in a growable float32 buffer; ids map to rows, and removals
+    swap the last row into the hole so the buffer stays dense.
+    """
+
+    def __init__(self):
+        self._matrix = None
+        self._size = 0
+        self._ids = []
+        self._rows = {}  # id -> row
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, item_id):
+        return item_id in self._rows
+
+    def _grow(self, needed, dim):
+        if self._matrix is None:
+            self._matrix = np.empty((max(needed, 64), dim), dtype=np.float32)
+        elif needed > self._matrix.shape[0]:
+            grown = np.empty((max(needed, self._matrix.shape[0] * 2), dim), dtype=np.float32)
+            grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+
+    def add(self, ids, vectors):
+        """Insert vectors, replacing any existing vector with the same id"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            self._grow(self._size + len(ids), vectors.shape[1])
+            for item_id, vector in zip(ids, vectors):
+                row = self._rows.get(item_id)
+                if row is None:
+                    row = self._size
+                    self._rows[item_id] = row
+                    self._ids.append(item_id)
+                    self._size += 1
+                self._matrix[row] = vector
+                self._on_set(row)
+
+    def remove(self, ids):
+        with self._lock:
+            for item_id in ids:
+                row = self._rows.pop(item_id, None)
+                if row is None:
+                    continue
+                last = self._size - 1
+                self._on_remove(row, last)
+                if row != last:
+                    moved_id = self._ids[last]
+                    self._matrix[row] = self._matrix[last]
+                    self._ids[row] = moved_id
+                    self._rows[moved_id] = row
+                self._ids.pop()
+                self._size -= 1
+
+    def _on_set(self, row):
+        pass
+
+    def _on_remove(self, row, last):
+        pass
+
+    def _candidate_rows(self, query):
+        return None  # all rows
+
+    def search(self, query, k):
+        """Return (ids, scores) of the k nearest vectors by inner product, best first"""
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        with self._lock:
+            if self._size == 0:
+                return [], np.empty(0, dtype=np.float32)
+            rows = self._candidate_rows(query)
+            if rows is None:
+                scores = self._matrix[:self._size] @ query
+                best = top_k_indices(scores, k)
+                return [self._ids[i] for i in best], scores[best]
+            scores = self._matrix[rows] @ query
+            best = top_k_indices(scores, k)
+            return [self._ids[rows[i]] for i in best], scores[best]
+
+
+class IVFIndex(ExactIndex):
+    """Inverted-file ANN index: k-means coarse quantizer plus exact re-scoring.
+
+    Each vector is assigned to its nearest centroid; a query scores only the
+    vectors in its nprobe closest lists. Below min_train_size the index simply
+    scans everything. The quantizer is retrained when the index has doubled
+    since the last training, so incremental inserts stay well balanced.
+    """
+
+    def __init__(self, nlist=None, nprobe=8, min_train_size=1024, train_iterations=10, seed=0):
+        super().__init__()
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+        self.train_iterations = train_iterations
+        self._rng = np.random.default_rng(seed)
+        self._centroids = None
+        self._trained_size = 0
+        self._assign = np.empty(0, dtype=np.int32)
+        self._lists = []
+
+    def add(self, ids, vectors):
+        with self._lock:
+            super().add(ids, vectors)
+            if self._size >= self.min_train_size and self._size >= 2 * self._trained_size:
+                self.train()
+
+    def train(self):
+        """(Re)build the coarse quantizer with spherical k-means over the current vectors"""
+        with self._lock:
+            data = self._matrix[:self._size]
+            nlist = self.nlist or max(1, int(np.sqrt(self._size)))
+            nlist = min(nlist, self._size)
+
+            sample_size = min(self._size, nlist * 64)
+            sample = data[self._rng.choice(self._size, sample_size, replace=False)]
+            centroids = sample[self._rng.choice(sample_size, nlist, replace=False)].copy()
+            for _ in range(self.train_iterations):
+                labels = np.argmax(sample @ centroids.T, axis=1)
+                for c in range(nlist):
+                    members = sample[labels == c]
+                    if len(members):
+                        centroids[c] = members.sum(axis=0)
+                norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                centroids /= norms
+
+            self._centroids = centroids
+            self._assign = np.argmax(data @ centroids.T, axis=1).astype(np.int32)
+            self._lists = [set() for _ in range(nlist)]
+            for row, c in enumerate(self._assign):
+                self._lists[c].add(row)
+            self._trained_size = self._size
+
+    def _on_set(self, row):
+        if self._centroids is None:
+            return
+        if row >= self._assign.shape[0]:
+            grown = np.full(max(row + 1, self._assign.shape[0] * 2), -1, dtype=np.int32)
+            grown[:self._assign.shape[0]] = self._assign
+            self._assign = grown
+        old = self._assign[row]
+        if old >= 0:
+            self._lists[old].discard(row)
+        c = int(np.argmax(self._centroids @ self._matrix[row]))
+        self._assign[row] = c
+        self._lists[c].add(row)
+
+    def _on_remove(self, row, last):
+        if self._centroids is None:
+            return
+        self._lists[self._assign[row]].discard(row)
+        if row != last:
+            moved = self._assign[last]
+            self._lists[moved].discard(last)
+            self._lists[moved].add(row)
+            self._assign[row] = moved
+        self._assign[last] = -1
+
+    def _candidate_rows(self, query):
+        if self._centroids is None:
+            return None
+        probe = top_k_indices(self._centroids @ query, self.nprobe)
+        rows = [row for c in probe for row in self._lists[c]]
+        return np.fromiter(rows, dtype=np.int64, count=len(rows))
+
+
+def make_index(backend=None):
+    """Build the vector index selected by VECTOR_INDEX_BACKEND ("exact" or "ivf")"""
+    backend = backend or os.getenv("VECTOR_INDEX_BACKEND", "exact")
+    if backend == "exact":
+        return ExactIndex()
+    if backend == "ivf":
+        return IVFIndex(nprobe=int(os.getenv("VECTOR_INDEX_NPROBE", "8")))
+    raise ValueError(f"Unknown vector index backend: {backend}")
+
+
+def evaluate_index(candidate, exact, queries, k=10):
+    """Compare an ANN index against the exact index on the same queries.
+
+    Returns mean recall@k plus mean per-query latency of both backends in ms.
+    """
+    recalls = []
+    exact_seconds = 0.0
+    candidate_seconds = 0.0
+    for query in queries:
+        start = time.perf_counter()
+        truth, _ = exact.search(query, k)
+        exact_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        found, _ = candidate.search(query, k)
+        candidate_seconds += time.perf_counter() - start
+
+        if truth:
+            recalls.append(len(set(truth) & set(found)) / len(truth))
+
+    n = max(len(queries), 1)
+    return {
+        "recall_at_k": float(np.mean(recalls)) if recalls else 0.0,
+        "k": k,
+        "queries": len(queries),
+        "exact_ms": exact_seconds / n * 1000,
+        "candidate_ms": candidate_seconds / n * 1000
+    }
+
+
+if __name__ == "__main__":
+    # Measure IVF recall and latency against exact search on the stored bill embeddings:
+    #   python vector_index.py [num_queries] [k]
+    import sys
+
+    import db
+
+    num_queries = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    rows = db.query("SELECT bill_number, embedding FROM bill_embeddings")
+    if not rows:
+        sys.exit("No stored bill embeddings; run a search or a bill sync first")
+
+    ids = [row[0] for row in rows]
+    vectors = np.vstack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+
+    exact = ExactIndex()
+    exact.add(ids, vectors)
+    ivf = IVFIndex(nprobe=int(os.getenv("VECTOR_INDEX_NPROBE", "8")), min_train_size=1)
+    ivf.add(ids, vectors)
+
+    # Perturbed copies of stored bills stand in for real queries
+    rng = np.random.default_rng(0)
+    picks = vectors[rng.choice(len(vectors), min(num_queries, len(vectors)), replace=False)]
+    queries = picks + rng.normal(scale=0.05, size=picks.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    print(evaluate_index(ivf, exact, queries, k=k))
@@ -0,0 +1,168 @@
+import logging
+import os
+import sys
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+import db
+
+logger = logging.getLogger(__name__)
+
+YES_VOTES = ("Yea", "Aye")
+NO_VOTES = ("Nay", "No")
+ABSTAIN_VOTES = ("Present", "Not Voting")
+
+
+def _text(element, path, default=""):
+    found = element.find(path)
+    return found.text.strip() if found is not None and found.text else default
+
+
+def parse_roll_call(path):
+    """Parse one House Clerk roll-call XML file (clerk.house.gov/evs/<year>/rollNNN.xml).
+
+    Returns (bill_number, roll_call_id, records) where records are
+    (legislator_id, legislator_name, party, state, vote, date) tuples, or None
+    if the vote is not on an H.R. bill.
+    """
+    root = ET.parse(path).getroot()
+    metadata = root.find("vote-metadata")
+    if metadata is None:
+        return None
+
+    # legis-num looks like "H R 815"; resolutions, Senate bills and quorum calls are skipped
+    legis_num = _text(metadata, "legis-num").upper().split()
+    if len(legis_num) != 3 or legis_num[:2] != ["H", "R"]:
+        return None
+    bill_number = legis_num[2]
+
+    congress = _text(metadata, "congress")
+    session = _text(metadata, "session")[:1]
+    roll_num = int(_text(metadata, "rollcall-num", "0"))
+    # Zero-padded so the latest roll call sorts last as a string
+    roll_call_id = f"{congress}-{session}-{roll_num:04d}"
+
+    action_date = _text(metadata, "action-date")
+    try:
+        action_date = datetime.strptime(action_date, "%d-%b-%Y").strftime("%Y-%m-%d")
+    except ValueError:
+        pass
+
+    records = []
+    for recorded_vote in root.iter("recorded-vote"):
+        legislator = recorded_vote.find("legislator")
+        if legislator is None:
+            continue
+        records.append((
+            legislator.get("name-id", ""),
+            (legislator.text or legislator.get("unaccented-name", "")).strip(),
+            legislator.get("party", ""),
+            legislator.get("state", ""),
+            _text(recorded_vote, "vote"),
+            action_date
+        ))
+
+    return bill_number, roll_call_id, records
+
+
+def refresh_state_aggregates(bill_numbers, chunk_size=500):
+    """Recompute per-state yes/no/abstain counts from each bill's latest roll call"""
+    bill_numbers = sorted(set(bill_numbers))
+    for start in range(0, len(bill_numbers), chunk_size):
+        _refresh_state_aggregates(bill_numbers[start:start + chunk_size])
+
+
+def _refresh_state_aggregates(bill_numbers):
+    placeholders = ",".join("?" * len(bill_numbers))
+    yes = ",".join(f"'{v}'" for v in YES_VOTES)
+    no = ",".join(f"'{v}'" for v in NO_VOTES)
+    abstain = ",".join(f"'{v}'" for v in ABSTAIN_VOTES)
+
+    with db.transaction() as conn:
+        conn.execute(
+            f"DELETE FROM voting_state_aggregates WHERE bill_number IN ({placeholders})",
+            bill_numbers
+        )
+        conn.execute(f'''
+            INSERT INTO voting_state_aggregates
+            (bill_number, state, roll_call_id, yes_votes, no_votes, abstain, support_percentage)
+            SELECT v.bill_number, v.state, v.roll_call_id,
+                   SUM(v.vote IN ({yes})),
+                   SUM(v.vote IN ({no})),
+                   SUM(v.vote IN ({abstain})),
+                   CASE WHEN SUM(v.vote IN ({yes}, {no})) > 0
+                        THEN CAST(ROUND(100.0 * SUM(v.vote IN ({yes})) / SUM(v.vote IN ({yes}, {no}))) AS INTEGER)
+                        ELSE 0 END
+            FROM voting_records v
+            JOIN (
+                SELECT bill_number, MAX(roll_call_id) AS roll_call_id
+                FROM voting_records
+                WHERE bill_number IN ({placeholders})
+                GROUP BY bill_number
+            ) latest ON latest.bill_number = v.bill_number AND latest.roll_call_id = v.roll_call_id
+            GROUP BY v.bill_number, v.state
+        ''', bill_numbers)
+
+
+def import_roll_calls(directory):
+    """Bulk-load every roll-call XML file in directory into voting_records.
+
+    Re-importing a file is harmless: rows are unique per roll call and
+    legislator. Aggregates are rebuilt for every bill that was touched.
+    Returns (files imported, votes written).
+    """
+    touched = set()
+    files = 0
+    votes = 0
+
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(".xml"):
+            continue
+        try:
+            parsed = parse_roll_call(os.path.join(directory, name))
+        except ET.ParseError as e:
+            logger.warning("Skipping malformed roll call", extra={"file": name, "error": str(e)})
+            continue
+        if parsed is None:
+            continue
+
+        bill_number, roll_call_id, records = parsed
+        db.execute_many('''
+            INSERT OR REPLACE INTO voting_records
+            (bill_number, roll_call_id, legislator_id, legislator_name, party, state, vote, date)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(bill_number, roll_call_id) + record for record in records])
+        touched.add(bill_number)
+        files += 1
+        votes += len(records)
+
+    refresh_state_aggregates(touched)
+    return files, votes
+
+
+def get_state_aggregates(bill_number):
+    """Heatmap data for a bill: one indexed read of the precomputed aggregates"""
+    rows = db.query('''
+        SELECT state, yes_votes, no_votes, abstain, support_percentage
+        FROM voting_state_aggregates
+        WHERE bill_number = ?
+    ''', (bill_number,))
+    return {
+        state: {
+            "yes_votes": yes_votes,
+            "no_votes": no_votes,
+            "abstain": abstain,
+            "support_percentage": support_percentage
+        }
+        for state, yes_votes, no_votes, abstain, support_percentage in rows
+    }
+
+
+if __name__ == "__main__":
+    # Import House Clerk roll-call XML files into bill_tracker.db (start the
+    # app once first so the schema is migrated): python voting.py <directory>
+    if len(sys.argv) != 2:
+        sys.exit("usage: python voting.py <roll-call-xml-directory>")
+
+    imported, written = import_roll_calls(sys.argv[1])
+    print(f"Imported {imported} roll calls ({written} member votes)")